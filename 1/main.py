@@ -1,43 +1,70 @@
 """Day 1 puzzle solutions."""
 
+from __future__ import annotations
+
 import logging
-from os.path import dirname
-from os.path import join as pathjoin
+import sys
+from collections import Counter
+from os.path import abspath, dirname
+
+# Same as `typing.TYPE_CHECKING`, without importing `typing` at startup
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    # NumPy is slow to import, it is only imported when a puzzle is solved
+    import numpy as np
+
+if __package__ in (None, ""):
+    # Running as a script, make the shared `aoc` package importable
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
-import numpy as np
+# pylint: disable=wrong-import-position
+from aoc.days import input_path
+from aoc.engines import Engine, solve_with_engine
+from aoc.inputs import InputSource, open_input
+from aoc.tracing import configure_logging, get_tracer
 
-# Load and configure the logger
-LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
-logging.basicConfig(
-    level=logging.INFO, handlers=[logging.StreamHandler()], format=LOG_FORMAT
-)
+# Load the logger and the tracer (configured by the entry point)
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+# Input file names, the paths are resolved on access (see `__getattr__`)
+INPUT_FILES = {
+    "SMALL_INPUT": "small_input",
+    "INPUT": "input",
+}
+
 
-# Constants for the input paths
-INPUT_FOLDER = pathjoin(dirname(__file__), "inputs")
-SMALL_INPUT = pathjoin(INPUT_FOLDER, "small_input")
-INPUT = pathjoin(INPUT_FOLDER, "input")
+def __getattr__(name: str) -> str:
+    """
+    Resolve the input path constants (`INPUT`, `SMALL_INPUT`...) on access.
+
+    :param str name: The constant name
+    :raises AttributeError: If the name is not an input constant
+    :return str: The input file path
+    """
+    if name in INPUT_FILES:
+        return input_path(__file__, INPUT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def read_input(file: str) -> tuple[np.ndarray, np.ndarray]:
+def read_input(file: InputSource) -> tuple[np.ndarray, np.ndarray]:
     """
     Read the input file and format the content to a tuple of lists.
 
-    :param str file: The input file name
+    :param InputSource file: The input file path or stream
     :return tuple[np.ndarray, np.ndarray]: The formatted output
     """
-    # Open the file
-    with open(file, "r", encoding="utf-8") as in_file:
-        lines = in_file.readlines()
+    import numpy as np  # pylint: disable=import-outside-toplevel
 
     left, right = [], []
-    # Read line by line
-    for line in lines:
-        # Split the line in 2 and cast both positions to int
-        left_pos, right_pos = [int(position.strip()) for position in line.split()]
-        # Add left position to left list and right position to right list
-        left.append(left_pos)
-        right.append(right_pos)
+    # Open the file and read it line by line
+    with open_input(file) as in_file:
+        for line in in_file:
+            # Split the line in 2 and cast both positions to int
+            left_pos, right_pos = [int(position.strip()) for position in line.split()]
+            # Add left position to left list and right position to right list
+            left.append(left_pos)
+            right.append(right_pos)
 
     # Create numpy arrays for both lists (easier to manipulate)
     np_left = np.array(left)
@@ -50,15 +77,39 @@ def read_input(file: str) -> tuple[np.ndarray, np.ndarray]:
     return (np_left, np_right)
 
 
-def puzzle1(file: str) -> int:
+def count_index(right: np.ndarray) -> dict[int, int]:
     """
-    Solves the first puzzle.
+    Count the appearances of each position in the right list.
 
-    :param str file: The input file
-    :return int: The puzzle solution for the given input
+    :param np.ndarray right: The right list
+    :return dict[int, int]: The number of appearances of each position
+    """
+    return Counter(right.tolist())
+
+
+def prepare(file: InputSource) -> tuple[np.ndarray, np.ndarray, dict[int, int]]:
+    """
+    Read the input file and build the structures used by both puzzles.
+
+    The output can be reused to solve both puzzles (see `solve1` and `solve2`).
+
+    :param InputSource file: The input file path or stream
+    :return tuple[np.ndarray, np.ndarray, dict[int, int]]: The left list, the
+    right list and the count index of the right list
     """
-    # Load the input
     left, right = read_input(file)
+    return left, right, count_index(right)
+
+
+def total_distance(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Get the total distance between the left and the right lists.
+
+    :param np.ndarray left: The left list
+    :param np.ndarray right: The right list
+    :return int: The sum of the distances between the sorted lists
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
 
     # Sort the numpy arrays
     sorted_left = np.sort(left)
@@ -73,54 +124,152 @@ def puzzle1(file: str) -> int:
     np_sum = np.sum(np_abs_diff)
     logger.debug("Sum of the absolute differences: %s", np_sum)
 
-    return np_sum
+    return int(np_sum)
 
 
-def puzzle2(file: str) -> int:
+def similarity_score(left: np.ndarray, right_counts: dict[int, int]) -> int:
+    """
+    Get the similarity score of the left list with the right list.
+
+    :param np.ndarray left: The left list
+    :param dict[int, int] right_counts: The count index of the right list
+    :return int: The similarity score
+    """
+    # Start the similarity score at 0
+    score = 0
+
+    # Go through each element of the left list
+    sample = tracer.sample
+    for left_pos in left.tolist():
+        # Get the number of appearances of the current left position
+        # in the right list
+        right_pos_count = right_counts.get(left_pos, 0)
+
+        # Calculate the similarity score
+        score += left_pos * right_pos_count
+        if sample:
+            sample(
+                "left_position",
+                "Appearances of the left position '%s' in the right list : %s",
+                left_pos,
+                right_pos_count,
+            )
+
+    tracer.count("left_positions", len(left))
+    logger.debug("Final similarity score : %s", score)
+
+    return score
+
+
+def solve1(prepared: tuple[np.ndarray, np.ndarray, dict[int, int]]) -> int:
+    """
+    Solves the first puzzle on a prepared input.
+
+    :param tuple[np.ndarray, np.ndarray, dict[int, int]] prepared: The output of
+    `prepare`
+    :return int: The puzzle solution for the given input
+    """
+    left, right, _ = prepared
+    return total_distance(left, right)
+
+
+def solve2(prepared: tuple[np.ndarray, np.ndarray, dict[int, int]]) -> int:
+    """
+    Solves the second puzzle on a prepared input.
+
+    :param tuple[np.ndarray, np.ndarray, dict[int, int]] prepared: The output of
+    `prepare`
+    :return int: The puzzle solution for the given input
+    """
+    left, _, right_counts = prepared
+    return similarity_score(left, right_counts)
+
+
+def puzzle1(file: InputSource) -> int:
+    """
+    Solves the first puzzle.
+
+    :param InputSource file: The input file path or stream
+    :return int: The puzzle solution for the given input
+    """
+    # Load the input
+    left, right = read_input(file)
+
+    return total_distance(left, right)
+
+
+def puzzle2(file: InputSource) -> int:
     """
     Solves the second puzzle.
 
-    :param str file: The input file
+    :param InputSource file: The input file path or stream
     :return int: The puzzle solution for the given input
     """
     # Load the input
     left, right = read_input(file)
 
-    # Start the similarity score at 0
-    similarity_score = 0
+    return similarity_score(left, count_index(right))
 
-    # Go through each element of the left list
-    for left_pos in left:
-        # Extract all the positions from the right list that are equal
-        # to the current left position and count them
-        # shape[0] is the same as the len of a 1D-array
-        right_pos_count = np.extract(right == left_pos, right).shape[0]
-        logger.debug(
-            "Appearances of the left position '%s' in the right list : %s",
-            left_pos,
-            right_pos_count,
-        )
 
-        # Calculate the similarity score
-        similarity_score += left_pos * right_pos_count
-        logger.debug("Current similarity score is : %s", similarity_score)
+def solve_both(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with a single parse of the input and a single sort.
+
+    The similarity score is obtained by a merge-join of the sorted lists: the
+    appearances of a left position in the right list are the width of its
+    range of equal values in the sorted right list.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # Load the input and sort both lists once
+    left, right = read_input(file)
+    sorted_left = np.sort(left)
+    sorted_right = np.sort(right)
+
+    # First puzzle: sum of the distances between the sorted lists
+    distance = np.sum(np.abs(sorted_left - sorted_right))
+
+    # Second puzzle: find the range of each left position in the right list
+    range_starts = np.searchsorted(sorted_right, sorted_left, side="left")
+    range_ends = np.searchsorted(sorted_right, sorted_left, side="right")
+    score = np.sum(sorted_left * (range_ends - range_starts))
+
+    tracer.count("left_positions", len(left))
+
+    return int(distance), int(score)
 
-    logger.debug("Final similarity score : %s", similarity_score)
 
-    return similarity_score
+# Engines solving both puzzles, from the most general to the most specialized
+# (see `aoc.engines`)
+ENGINES = {
+    "fused": Engine(solve_both),
+}
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """
     Main function
+
+    :param list[str] | None argv: The command line arguments, defaults to
+    `sys.argv[1:]`
     """
-    ### First part of the problem
-    res1 = puzzle1(INPUT)
-    print(f"First part result : {res1}")
+    # pylint: disable-next=import-outside-toplevel
+    from aoc.cli import parse_day_args
 
-    ### Second part of the problem
-    res2 = puzzle2(INPUT)
+    args = parse_day_args(__doc__, input_path(__file__, INPUT_FILES["INPUT"]), argv)
+    configure_logging(args.log_level, args.trace_sample, args.trace_summary)
+    input_file = args.file
+
+    ### Both parts of the problem, with the selected engine
+    res1, res2 = solve_with_engine(
+        sys.modules[__name__], input_file, args.engine, args.check_rate
+    )
+    print(f"First part result : {res1}")
     print(f"Second part result : {res2}")
+    tracer.summarize(logging.INFO)
 
 
 if __name__ == "__main__":
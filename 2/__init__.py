@@ -0,0 +1 @@
+"""Day 2 puzzle solutions."""
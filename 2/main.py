@@ -1,48 +1,98 @@
 """Day 2 puzzle solutions."""
 
 import logging
-from os.path import dirname
-from os.path import join as pathjoin
-
-# Load and configure the logger
-LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
-logging.basicConfig(
-    level=logging.INFO, handlers=[logging.StreamHandler()], format=LOG_FORMAT
-)
+import os
+import sys
+from collections import OrderedDict
+from collections.abc import Sequence
+from operator import sub
+from os.path import abspath, dirname
+
+if __package__ in (None, ""):
+    # Running as a script, make the shared `aoc` package importable
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from aoc.days import input_path
+from aoc.engines import Engine, solve_with_engine
+from aoc.inputs import InputSource, open_input
+from aoc.ragged import RaggedArray
+from aoc.tracing import configure_logging, get_tracer
+
+# Load the logger and the tracer (configured by the entry point)
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
-# Constants for the input paths
-INPUT_FOLDER = pathjoin(dirname(__file__), "inputs")
-SMALL_INPUT = pathjoin(INPUT_FOLDER, "small_input")
-INPUT = pathjoin(INPUT_FOLDER, "input")
+# Input file names, the paths are resolved on access (see `__getattr__`)
+INPUT_FILES = {
+    "SMALL_INPUT": "small_input",
+    "INPUT": "input",
+}
 
+# Number of difference sequences whose verdicts are kept by default
+SAFETY_CACHE_SIZE = 1 << 16
 
-def read_input(file: str) -> list[list[int]]:
+
+def __getattr__(name: str) -> str:
+    """
+    Resolve the input path constants (`INPUT`, `SMALL_INPUT`...) on access.
+
+    :param str name: The constant name
+    :raises AttributeError: If the name is not an input constant
+    :return str: The input file path
+    """
+    if name in INPUT_FILES:
+        return input_path(__file__, INPUT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def read_input(file: InputSource) -> RaggedArray:
     """
-    Read the input file and format the content to a list of reports.
+    Read the input file and format the content to a ragged array of reports.
 
-    Each report contains a list of levels (integers).
+    Each report (row) contains a list of levels (integers).
 
-    :param str file: The input file name
-    :return list[list[int]]: The formatted output
+    :param InputSource file: The input file path or stream
+    :return RaggedArray: The formatted output
     """
     # Open the file
-    with open(file, "r", encoding="utf-8") as in_file:
-        lines = in_file.readlines()
-
-    # Each line is a report containing a list of levels (integers)
-    reports = []
-    for line in lines:
-        # Read each report by splitting the line by spaces
-        # and converting each level to an int
-        report = [int(level.strip()) for level in line.split()]
-        logger.debug("Created report : %s", report)
-        reports.append(report)
+    with open_input(file) as in_file:
+        # Each line is a report containing levels separated by spaces
+        reports = RaggedArray.parse(in_file)
+    logger.debug("Created %s reports", len(reports))
 
     return reports
 
 
-def is_safe(report: list[int], dampener: bool = False) -> bool:
+def is_safe_without(report: Sequence[int], skipped: int) -> bool:
+    """
+    Check if a report is safe when one of its levels is skipped.
+
+    The levels are compared by index around the skipped one, the report is not
+    copied.
+
+    :param Sequence[int] report: The list of levels of the report
+    :param int skipped: The index of the level to skip
+    :return bool: `True` if the report without the level is safe, `False` if not
+    """
+    # The 2 first remaining levels set the expected order
+    level_1 = 1 if skipped == 0 else 0
+    first_level_2 = level_1 + 1 if level_1 + 1 != skipped else level_1 + 2
+    if first_level_2 >= len(report):
+        return True
+    order = 1 if report[level_1] <= report[first_level_2] else -1
+
+    # Same rules as `is_safe`, the skipped level is jumped over
+    for level_2 in range(first_level_2, len(report)):
+        if level_2 == skipped:
+            continue
+        if not 1 <= (report[level_2] - report[level_1]) * order <= 3:
+            return False
+        level_1 = level_2
+    return True
+
+
+def is_safe(report: Sequence[int], dampener: bool = False) -> bool:
     """
     Check if a report is safe.
 
@@ -52,12 +102,11 @@ def is_safe(report: list[int], dampener: bool = False) -> bool:
 
     For the 2nd puzzle, one bad level is tolerated. A dampener is set for one use.
 
-    :param list[int] report: The list of levels of the report
+    :param Sequence[int] report: The list of levels of the report
     :param bool dampener: `True` if the dampener is used, `False` if not, defaults
     to `False`
     :return bool: `True` if the report is safe, `False` if not.
     """
-    logger.debug("Checking the report safeness for report %s", report)
     # If the report contains only 1 level it is safe
     report_len = len(report)
     if report_len < 2:
@@ -81,34 +130,16 @@ def is_safe(report: list[int], dampener: bool = False) -> bool:
         # Check that the order is respected (multiplication by order to get
         # a positive difference) and that the difference is between 1 and 3
         if not 1 <= level_diff * order <= 3:
-            logger.debug(
-                "Report %s is unsafe at adjacent levels %s - %s "
-                "(expected order was %s)",
-                report,
-                report[level_1],
-                report[level_2],
-                "ascending" if order == 1 else "descending",
-            )
             if dampener:
-                logger.debug("Using the dampener")
                 # If the dampener for the second puzzle is set, try testing the
-                # report safeness by removing level 1 or level 2 from the report
-                report_rem_lvl_1 = report.copy()
-                report_rem_lvl_1.pop(level_1)
-                report_rem_lvl_2 = report.copy()
-                report_rem_lvl_2.pop(level_2)
+                # report safeness without level 1 or level 2
                 # Treat the case of [54, 56, 54, 52, 51, 49]
                 # The predicted order might be wrong and maybe the first level
                 # should be the one to be removed
-                report_rem_lvl_0 = None
-                if level_1 >= 1:
-                    report_rem_lvl_0 = report.copy()
-                    report_rem_lvl_0.pop(level_1 - 1)
-                # Test if one of the three reports is safe
                 return (
-                    is_safe(report_rem_lvl_1)
-                    or is_safe(report_rem_lvl_2)
-                    or (is_safe(report_rem_lvl_0) if report_rem_lvl_0 else False)
+                    is_safe_without(report, level_1)
+                    or is_safe_without(report, level_2)
+                    or (level_1 >= 1 and is_safe_without(report, level_1 - 1))
                 )
 
             # If a rule is not respected and the dampener is not set, return False
@@ -122,65 +153,336 @@ def is_safe(report: list[int], dampener: bool = False) -> bool:
     return True
 
 
-def puzzle1(file: str) -> int:
+class SafetyCache:
     """
-    Solves the first puzzle.
+    The safety verdicts of the reports, kept by sequence of level differences.
 
-    :param str file: The input file
+    Both verdicts of a report (without and with the dampener) only depend on
+    the differences between its adjacent levels: reports with the same
+    differences share their verdicts. The least recently used sequences are
+    evicted once `max_size` sequences are kept.
+    """
+
+    __slots__ = ("verdicts", "max_size", "hits", "misses")
+
+    def __init__(self, max_size: int = SAFETY_CACHE_SIZE) -> None:
+        """
+        Create an empty cache.
+
+        :param int max_size: The number of difference sequences kept, defaults
+        to `SAFETY_CACHE_SIZE`
+        """
+        self.verdicts: OrderedDict[tuple[int, ...], tuple[bool, bool]] = (
+            OrderedDict()
+        )
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, report: Sequence[int]) -> tuple[bool, bool]:
+        """
+        Get the verdicts of a report, computing them on a miss.
+
+        :param Sequence[int] report: The list of levels of the report
+        :return tuple[bool, bool]: Whether the report is safe without and with
+        the dampener
+        """
+        diffs = tuple(map(sub, report[1:], report[:-1]))
+        verdicts = self.verdicts.get(diffs)
+        if verdicts is not None:
+            self.hits += 1
+            self.verdicts.move_to_end(diffs)
+            return verdicts
+
+        self.misses += 1
+        safe = is_safe(report)
+        verdicts = safe, safe or is_safe(report, dampener=True)
+        self.verdicts[diffs] = verdicts
+        if len(self.verdicts) > self.max_size:
+            self.verdicts.popitem(last=False)
+        return verdicts
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of the lookups answered from the cache.
+
+        :return float: The hit rate, `0.0` before any lookup
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """
+        Forget all the verdicts and reset the statistics.
+        """
+        self.verdicts.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Verdicts shared by the runs of the `memoized` engine in this process
+safety_cache = SafetyCache()
+
+
+def solve1(reports: RaggedArray) -> int:
+    """
+    Solves the first puzzle on a parsed input.
+
+    :param RaggedArray reports: The output of `read_input`
     :return int: The puzzle solution for the given input
     """
-    # Load the input
-    reports = read_input(file)
 
     # Go through each report of the list
     safe_reports = 0
+    sample = tracer.sample
     for report in reports:
         # Check that it is safe according to puzzle 1 rules
         if is_safe(report):
-            logger.debug("Report %s is safe", report)
             safe_reports += 1
-        else:
-            logger.debug("Report %s is UNSAFE", report)
+        elif sample:
+            sample("unsafe", "Report %s is UNSAFE", report.tolist())
+
+    tracer.count("reports", len(reports))
+    tracer.count("safe_reports", safe_reports)
 
     # Return the solution
     return safe_reports
 
 
-def puzzle2(file: str) -> int:
+def puzzle1(file: InputSource) -> int:
     """
-    Solves the second puzzle.
+    Solves the first puzzle.
 
-    :param str file: The input file
+    :param InputSource file: The input file path or stream
     :return int: The puzzle solution for the given input
     """
     # Load the input
-    reports = read_input(file)
+    return solve1(read_input(file))
+
+
+def solve2(reports: RaggedArray) -> int:
+    """
+    Solves the second puzzle on a parsed input.
+
+    :param RaggedArray reports: The output of `read_input`
+    :return int: The puzzle solution for the given input
+    """
 
     # Go through each report of the list
     safe_reports = 0
+    sample = tracer.sample
     for report in reports:
         # Check that it is safe according to puzzle 2 rules
         if is_safe(report, dampener=True):
-            logger.debug("Report %s is safe", report)
             safe_reports += 1
-        else:
-            logger.debug("Report %s is UNSAFE", report)
+        elif sample:
+            sample("unsafe", "Report %s is UNSAFE", report.tolist())
+
+    tracer.count("reports", len(reports))
+    tracer.count("safe_reports", safe_reports)
 
     # Return the solution
     return safe_reports
 
 
-def main() -> None:
+def puzzle2(file: InputSource) -> int:
+    """
+    Solves the second puzzle.
+
+    :param InputSource file: The input file path or stream
+    :return int: The puzzle solution for the given input
+    """
+    # Load the input
+    return solve2(read_input(file))
+
+
+def count_safe_reports(
+    reports: RaggedArray, cache: SafetyCache | None = None
+) -> tuple[int, int]:
+    """
+    Count the safe reports without and with the dampener in a single traversal.
+
+    A report that is safe without the dampener is safe with it, the dampener is
+    only tried on the reports that are unsafe without it.
+
+    :param RaggedArray reports: The reports
+    :param SafetyCache | None cache: The verdicts cache, defaults to None (every
+    report is checked)
+    :return tuple[int, int]: The number of safe reports without and with the
+    dampener
+    """
+    safe_reports = 0
+    dampened_safe_reports = 0
+    sample = tracer.sample
+    # Go through each report of the list
+    for report in reports:
+        if cache is not None:
+            safe, dampened_safe = cache.get(report)
+        else:
+            safe = is_safe(report)
+            dampened_safe = safe or is_safe(report, dampener=True)
+        if safe:
+            safe_reports += 1
+        if dampened_safe:
+            dampened_safe_reports += 1
+        elif sample:
+            sample("unsafe", "Report %s is UNSAFE", report.tolist())
+
+    tracer.count("reports", len(reports))
+    tracer.count("safe_reports", safe_reports)
+
+    return safe_reports, dampened_safe_reports
+
+
+def solve_both(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with a single parse and traversal of the input.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    # Load the input
+    return count_safe_reports(read_input(file))
+
+
+def solve_memoized(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with the verdicts of the reports kept by sequence of
+    level differences, for inputs repeating the same differences.
+
+    The verdicts are kept between the runs of the process (`safety_cache`).
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    hits, misses = safety_cache.hits, safety_cache.misses
+    # Load the input
+    solutions = count_safe_reports(read_input(file), safety_cache)
+
+    tracer.count("cache_hits", safety_cache.hits - hits)
+    tracer.count("cache_misses", safety_cache.misses - misses)
+    logger.debug(
+        "Safety cache: %s sequences kept, %.1f%% hit rate",
+        len(safety_cache.verdicts),
+        100 * safety_cache.hit_rate,
+    )
+
+    # Return the solutions
+    return solutions
+
+
+def solve_vectorized(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with NumPy operations on all the reports at once.
+
+    The differences between adjacent levels are computed on the flat values of
+    the reports, a report is safe if none of its differences breaks the rules of
+    the ascending or of the descending order. The dampener is only tried, one
+    report at a time, on the unsafe reports with at most two broken differences.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # Load the input
+    reports = read_input(file)
+    values = np.frombuffer(reports.values, dtype=np.int32)
+    starts = np.frombuffer(reports.offsets, dtype=np.int64)[:-1]
+    ends = np.frombuffer(reports.offsets, dtype=np.int64)[1:]
+
+    # The differences of a report are the ones between its first and last levels
+    diffs = np.diff(values)
+    last_diffs = np.maximum(ends - 1, starts)
+
+    # Fewest differences breaking the ascending or the descending order
+    min_broken = np.full(len(reports), np.iinfo(np.int64).max)
+    for broken in ((diffs < 1) | (diffs > 3), (diffs > -1) | (diffs < -3)):
+        # Number of differences breaking the order before each level
+        # (one more for the last differences of an empty report at the end)
+        nb_broken = np.zeros(len(values) + 1, dtype=np.int64)
+        nb_broken[1 : len(values)] = np.cumsum(broken)
+        np.minimum(min_broken, nb_broken[last_diffs] - nb_broken[starts], min_broken)
+    safe_reports = int(np.count_nonzero(min_broken == 0))
+
+    # Removing a level merges two differences, it can only fix up to two broken
+    # ones: the dampener is only tried on the reports that may become safe
+    dampened_safe_reports = safe_reports + sum(
+        is_safe(reports[report_nb], dampener=True)
+        for report_nb in np.flatnonzero((min_broken > 0) & (min_broken <= 2)).tolist()
+    )
+
+    tracer.count("reports", len(reports))
+    tracer.count("safe_reports", safe_reports)
+
+    # Return the solutions
+    return safe_reports, dampened_safe_reports
+
+
+def solve_parallel(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles by splitting the reports between worker processes.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Load the input
+    reports = read_input(file)
+
+    # One chunk of reports per core
+    nb_workers = os.cpu_count() or 1
+    chunk_size = -(-len(reports) // nb_workers) or 1
+    chunks = (
+        reports[start : start + chunk_size]
+        for start in range(0, len(reports), chunk_size)
+    )
+    with ProcessPoolExecutor(nb_workers) as executor:
+        chunk_counts = list(executor.map(count_safe_reports, chunks))
+
+    # Return the solutions
+    return (
+        sum(safe_reports for safe_reports, _ in chunk_counts),
+        sum(dampened_safe_reports for _, dampened_safe_reports in chunk_counts),
+    )
+
+
+# Engines solving both puzzles, from the most general to the most specialized
+# (see `aoc.engines`)
+ENGINES = {
+    "fused": Engine(solve_both),
+    # Only pays off on inputs repeating the same differences, select it with
+    # `--engine memoized`
+    "memoized": Engine(solve_memoized, auto=False),
+    "vectorized": Engine(solve_vectorized, min_size=1 << 20),
+    "parallel": Engine(solve_parallel, min_size=64 << 20, min_cores=4),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
     """
     Main function
+
+    :param list[str] | None argv: The command line arguments, defaults to
+    `sys.argv[1:]`
     """
-    ### First part of the problem
-    res1 = puzzle1(INPUT)
-    print(f"First part result : {res1}")
+    # pylint: disable-next=import-outside-toplevel
+    from aoc.cli import parse_day_args
 
-    ### Second part of the problem
-    res2 = puzzle2(INPUT)
+    args = parse_day_args(__doc__, input_path(__file__, INPUT_FILES["INPUT"]), argv)
+    configure_logging(args.log_level, args.trace_sample, args.trace_summary)
+    input_file = args.file
+
+    ### Both parts of the problem, with the selected engine
+    res1, res2 = solve_with_engine(
+        sys.modules[__name__], input_file, args.engine, args.check_rate
+    )
+    print(f"First part result : {res1}")
     print(f"Second part result : {res2}")
+    tracer.summarize(logging.INFO)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Day 3 puzzle solutions."""
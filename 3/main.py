@@ -2,60 +2,87 @@
 
 import logging
 import re
-from os.path import dirname
-from os.path import join as pathjoin
-
-# Load and configure the logger
-LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
-logging.basicConfig(
-    level=logging.INFO, handlers=[logging.StreamHandler()], format=LOG_FORMAT
-)
+import sys
+from collections.abc import Iterable, Iterator
+from os.path import abspath, dirname
+
+if __package__ in (None, ""):
+    # Running as a script, make the shared `aoc` package importable
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from aoc.days import input_path
+from aoc.engines import Engine, solve_with_engine
+from aoc.inputs import InputSource, open_input
+from aoc.tracing import configure_logging, get_tracer
+
+# Load the logger and the tracer (configured by the entry point)
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
-# Constants for the input paths
-INPUT_FOLDER = pathjoin(dirname(__file__), "inputs")
-SMALL_INPUT = pathjoin(INPUT_FOLDER, "small_input")
-SMALL_INPUT_2 = pathjoin(INPUT_FOLDER, "small_input2")
-INPUT = pathjoin(INPUT_FOLDER, "input")
+# Input file names, the paths are resolved on access (see `__getattr__`)
+INPUT_FILES = {
+    "SMALL_INPUT": "small_input",
+    "SMALL_INPUT_2": "small_input2",
+    "INPUT": "input",
+}
 
 # Puzzle constants
 MUL_START = "mul("
 MUL_END = ")"
 DO_STR = "do()"
 DONT_STR = "don't()"
+# The regex that matches mul strings
+MUL_REGEX = r"mul\(\d{1,3},\d{1,3}\)"
+# The regex that matches mul, dos and don'ts strings
+INSTRUCTION_REGEX = r"mul\(\d{1,3},\d{1,3}\)|do\(\)|don't\(\)"
+# The same regex, capturing the mul operands, the do() and the don't()
+INSTRUCTION_GROUPS_REGEX = r"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))"
 
 
-def read_input(file: str) -> list[str]:
+def __getattr__(name: str) -> str:
+    """
+    Resolve the input path constants (`INPUT`, `SMALL_INPUT`...) on access.
+
+    :param str name: The constant name
+    :raises AttributeError: If the name is not an input constant
+    :return str: The input file path
+    """
+    if name in INPUT_FILES:
+        return input_path(__file__, INPUT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def read_input(file: InputSource) -> list[str]:
     """
     Read the input file and format the content to a list of strings.
 
-    :param str file: The input file name
-    :return Any: The formatted output
+    Only needed to solve both puzzles from the same lines: the puzzles (and
+    `solve_both`) solve the opened input while reading it, line by line.
+
+    :param InputSource file: The input file path or stream
+    :return list[str]: The formatted output
     """
-    # Open the file
-    with open(file, "r", encoding="utf-8") as in_file:
-        lines = in_file.readlines()
+    # Open the file and read it line by line
+    with open_input(file) as in_file:
+        lines = list(in_file)
 
     return lines
 
 
-def get_regex_matches(lines: list[str], regex: str) -> list[str]:
-    """Get the list of all the substrings that match the regex in the given lines.
+def get_regex_matches(lines: Iterable[str], regex: str) -> Iterator[str]:
+    """Get all the substrings that match the regex in the given lines, lazily.
 
-    :param list[str] lines: The list of lines of the input
+    :param Iterable[str] lines: The lines of the input (e.g. the opened input)
     :param str regex: The regex to match
-    :return list[str]: The list of substrings that match the regex
+    :yield str: The substrings that match the regex, in the input order
     """
-    substrings_match = []
+    compiled_regex = re.compile(regex)
 
     # Go through each line of the input
     for line in lines:
         # Get all the substrings that match the regex
-        regex_matchs = re.compile(regex).findall(line)
-        # Add the list of substrings in the line to the complete list
-        substrings_match.extend(regex_matchs)
-
-    return substrings_match
+        yield from compiled_regex.findall(line)
 
 
 def calculate_mul_result(mul_string: str) -> int:
@@ -65,73 +92,73 @@ def calculate_mul_result(mul_string: str) -> int:
     :param str mul_string: The mul string
     :return int: The result of the multiplication
     """
-    logger.debug("Calculating %s", mul_string)
     val_1, val_2 = [
         int(value) for value in mul_string.lstrip(MUL_START).rstrip(MUL_END).split(",")
     ]
-    result = val_1 * val_2
-    logger.debug("The result of %s * %s is %s", val_1, val_2, result)
-    return result
+    return val_1 * val_2
 
 
-def puzzle1(file: str) -> int:
+def solve1(input_lines: Iterable[str]) -> int:
     """
-    Solves the first puzzle.
+    Solves the first puzzle on a parsed input.
 
-    :param str file: The input file
+    :param Iterable[str] input_lines: The output of `read_input` or the opened
+    input
     :return int: The puzzle solution for the given input
     """
-    # Load the input
-    input_lines = read_input(file)
-
-    # The regex that matches mul strings
-    regex = r"mul\(\d{1,3},\d{1,3}\)"
-
-    # Get the multiplication strings from the input lines
-    mul_strings = get_regex_matches(input_lines, regex)
-    logger.debug("Found %s mul strings in the given input", len(mul_strings))
 
     sum_of_mul = 0
-    # Go through each mul string of the list
-    for mul_str in mul_strings:
+    nb_mul = 0
+    # Go through each mul string of the input lines
+    for nb_mul, mul_str in enumerate(get_regex_matches(input_lines, MUL_REGEX), 1):
         # Calculate the multiplication result
         mul_result = calculate_mul_result(mul_str)
         # Add the result of the multiplication to the total sum
         sum_of_mul += mul_result
 
+    logger.debug("Found %s mul strings in the given input", nb_mul)
+    tracer.count("mul", nb_mul)
+
     # Return the solution
     return sum_of_mul
 
 
-def puzzle2(file: str) -> int:
+def puzzle1(file: InputSource) -> int:
     """
-    Solves the second puzzle.
+    Solves the first puzzle.
 
-    :param str file: The input file
+    :param InputSource file: The input file path or stream
     :return int: The puzzle solution for the given input
     """
-    # Load the input
-    input_lines = read_input(file)
+    # Solve the input while reading it
+    with open_input(file) as in_file:
+        return solve1(in_file)
 
-    # The regex that matches mul, dos and don'ts strings
-    regex = r"mul\(\d{1,3},\d{1,3}\)|do\(\)|don't\(\)"
 
-    # Get the multiplication strings from the input lines
-    mul_dos_donts = get_regex_matches(input_lines, regex)
-    logger.debug("Found %s instructions in the given input", len(mul_dos_donts))
+def solve2(input_lines: Iterable[str]) -> int:
+    """
+    Solves the second puzzle on a parsed input.
+
+    :param Iterable[str] input_lines: The output of `read_input` or the opened
+    input
+    :return int: The puzzle solution for the given input
+    """
 
     sum_of_mul = 0
     enabled = True
-    # Go through each instruction of the list
-    for instruction in mul_dos_donts:
+    skipped = 0
+    nb_instructions = 0
+    sample = tracer.sample
+    # Go through each mul, do and don't string of the input lines
+    for nb_instructions, instruction in enumerate(
+        get_regex_matches(input_lines, INSTRUCTION_REGEX), 1
+    ):
         if instruction == DO_STR:
             # The instruction is do(), enable the mul calculation
             enabled = True
-            logger.debug("The mul calculation is ENABLED")
         elif instruction == DONT_STR:
             # The instruction is don't(), disable the mul calculation
             enabled = False
-            logger.debug("The mul calculation is DISABLED")
         elif enabled:
             # The instruction is a mul() and the calculation is enabled
             # Calculate the multiplication result
@@ -140,23 +167,124 @@ def puzzle2(file: str) -> int:
             sum_of_mul += mul_result
         else:
             # The instruction is a mul() but the calculation is disabled
-            logger.debug("The mul() instruction '%s' is skipped", instruction)
+            skipped += 1
+            if sample:
+                sample("skipped", "The mul() instruction '%s' is skipped", instruction)
+
+    logger.debug("Found %s instructions in the given input", nb_instructions)
+    tracer.count("instructions", nb_instructions)
+    tracer.count("skipped_mul", skipped)
 
     # Return the solution
     return sum_of_mul
 
 
-def main() -> None:
+def puzzle2(file: InputSource) -> int:
+    """
+    Solves the second puzzle.
+
+    :param InputSource file: The input file path or stream
+    :return int: The puzzle solution for the given input
+    """
+    # Solve the input while reading it
+    with open_input(file) as in_file:
+        return solve2(in_file)
+
+
+def solve_both(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with a single parse and regex scan of the input.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    sum_of_mul = 0
+    sum_of_enabled_mul = 0
+    enabled = True
+    nb_instructions = 0
+    # Go through each mul, do and don't string while reading the input
+    with open_input(file) as in_file:
+        for nb_instructions, instruction in enumerate(
+            get_regex_matches(in_file, INSTRUCTION_REGEX), 1
+        ):
+            if instruction == DO_STR:
+                enabled = True
+            elif instruction == DONT_STR:
+                enabled = False
+            else:
+                # The first puzzle adds up every mul(), the second one only
+                # the enabled ones
+                mul_result = calculate_mul_result(instruction)
+                sum_of_mul += mul_result
+                if enabled:
+                    sum_of_enabled_mul += mul_result
+
+    tracer.count("instructions", nb_instructions)
+
+    # Return the solutions
+    return sum_of_mul, sum_of_enabled_mul
+
+
+def solve_groups(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles while reading the input, with a regex capturing the
+    multiplication operands.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    sum_of_mul = 0
+    sum_of_enabled_mul = 0
+    enabled = True
+    with open_input(file) as in_file:
+        for line in in_file:
+            # Go through each instruction of the line
+            for val_1, val_2, do_str, dont_str in re.findall(
+                INSTRUCTION_GROUPS_REGEX, line
+            ):
+                if do_str:
+                    enabled = True
+                elif dont_str:
+                    enabled = False
+                else:
+                    mul_result = int(val_1) * int(val_2)
+                    sum_of_mul += mul_result
+                    if enabled:
+                        sum_of_enabled_mul += mul_result
+
+    # Return the solutions
+    return sum_of_mul, sum_of_enabled_mul
+
+
+# Engines solving both puzzles, from the most general to the most specialized
+# (see `aoc.engines`)
+ENGINES = {
+    "fused": Engine(solve_both),
+    "groups": Engine(solve_groups),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
     """
     Main function
+
+    :param list[str] | None argv: The command line arguments, defaults to
+    `sys.argv[1:]`
     """
-    ### First part of the problem
-    res1 = puzzle1(INPUT)
-    print(f"First part result : {res1}")
+    # pylint: disable-next=import-outside-toplevel
+    from aoc.cli import parse_day_args
 
-    ### Second part of the problem
-    res2 = puzzle2(INPUT)
+    args = parse_day_args(__doc__, input_path(__file__, INPUT_FILES["INPUT"]), argv)
+    configure_logging(args.log_level, args.trace_sample, args.trace_summary)
+    input_file = args.file
+
+    ### Both parts of the problem, with the selected engine
+    res1, res2 = solve_with_engine(
+        sys.modules[__name__], input_file, args.engine, args.check_rate
+    )
+    print(f"First part result : {res1}")
     print(f"Second part result : {res2}")
+    tracer.summarize(logging.INFO)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Day 4 puzzle solutions."""
@@ -1,24 +1,42 @@
 """Day I puzzle solutions."""
 
+from __future__ import annotations
+
 import logging
-from os.path import dirname
-from os.path import join as pathjoin
-
-# Load and configure the logger
-LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
-logging.basicConfig(
-    level=logging.INFO, handlers=[logging.StreamHandler()], format=LOG_FORMAT
-)
+import sys
+from os.path import abspath, dirname
+
+# Same as `typing.TYPE_CHECKING`, without importing `typing` at startup
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    # NumPy is slow to import, it is only imported when a region index is built
+    import numpy as np
+
+if __package__ in (None, ""):
+    # Running as a script, make the shared `aoc` package importable
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from aoc.days import input_path
+from aoc.engines import Engine, solve_with_engine
+from aoc.inputs import InputSource, open_input
+from aoc.tracing import configure_logging, get_tracer
+
+# Load the logger and the tracer (configured by the entry point)
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
-# Constants for the input paths
-INPUT_FOLDER = pathjoin(dirname(__file__), "inputs")
-SMALL_INPUT = pathjoin(INPUT_FOLDER, "small_input")
-SMALL_INPUT_2 = pathjoin(INPUT_FOLDER, "small_input2")
-INPUT = pathjoin(INPUT_FOLDER, "input")
+# Input file names, the paths are resolved on access (see `__getattr__`)
+INPUT_FILES = {
+    "SMALL_INPUT": "small_input",
+    "SMALL_INPUT_2": "small_input2",
+    "INPUT": "input",
+}
 
 # Puzzle constants
 XMAS_CHARS = ["X", "M", "A", "S"]
+# The corners of a diagonal of an 'X-MAS' pattern, read from top to bottom
+X_MAS_DIAGONALS = ("MS", "SM")
 # Direction constants
 DIRECTIONS = {
     "TOP LEFT": (-1, -1),
@@ -32,22 +50,32 @@ DIRECTIONS = {
 }
 
 
-def read_input(file: str) -> list[list[str]]:
+def __getattr__(name: str) -> str:
+    """
+    Resolve the input path constants (`INPUT`, `SMALL_INPUT`...) on access.
+
+    :param str name: The constant name
+    :raises AttributeError: If the name is not an input constant
+    :return str: The input file path
+    """
+    if name in INPUT_FILES:
+        return input_path(__file__, INPUT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def read_input(file: InputSource) -> list[list[str]]:
     """
     Read the input file and format the content to a list of lists of characters.
 
-    :param str file: The input file name
+    :param InputSource file: The input file path or stream
     :return list[list[str]]: The formatted output
     """
-    # Open the file
-    with open(file, "r", encoding="utf-8") as in_file:
-        lines = in_file.readlines()
-
     word_search = []
-    # Go through each line
-    for line in lines:
-        # Split the line character by character and add it to the word search
-        word_search.append(list(line.strip()))
+    # Open the file and go through each line
+    with open_input(file) as in_file:
+        for line in in_file:
+            # Split the line character by character and add it to the word search
+            word_search.append(list(line.strip()))
 
     return word_search
 
@@ -162,17 +190,16 @@ def check_x_mas(word_search: list[list[str]], line_nb: int, col_nb: int) -> bool
     return is_pattern_1 or is_pattern_2 or is_pattern_3 or is_pattern_4
 
 
-def puzzle1(file: str) -> int:
+def solve1(word_search: list[list[str]]) -> int:
     """
-    Solves the first puzzle.
+    Solves the first puzzle on a parsed input.
 
-    :param str file: The input file
+    :param list[list[str]] word_search: The output of `read_input`
     :return int: The puzzle solution for the given input
     """
-    # Load the input
-    word_search = read_input(file)
 
     nb_xmas = 0
+    sample = tracer.sample
     # Go through each character in the word search grid
     for line_nb, line in enumerate(word_search):
         for col_nb, _ in enumerate(line):
@@ -183,57 +210,498 @@ def puzzle1(file: str) -> int:
                     word_search, line_nb, col_nb, direction, XMAS_CHARS.copy()
                 ):
                     # The word has been found starting from that position and in that direction
-                    logger.info(
-                        "The word 'XMAS' was found starting from [%s, %s] in %s direction",
-                        line_nb,
-                        col_nb,
-                        direction_name,
-                    )
                     nb_xmas += 1
+                    if sample:
+                        sample(
+                            "xmas",
+                            "The word 'XMAS' was found starting from [%s, %s] in %s direction",
+                            line_nb,
+                            col_nb,
+                            direction_name,
+                        )
+
+    tracer.count("xmas", nb_xmas)
 
     # Return the solution
     return nb_xmas
 
 
-def puzzle2(file: str) -> int:
+def puzzle1(file: InputSource) -> int:
     """
-    Solves the second puzzle.
+    Solves the first puzzle.
 
-    :param str file: The input file
+    :param InputSource file: The input file path or stream
     :return int: The puzzle solution for the given input
     """
     # Load the input
-    word_search = read_input(file)
+    return solve1(read_input(file))
+
+
+def solve2(word_search: list[list[str]]) -> int:
+    """
+    Solves the second puzzle on a parsed input.
+
+    :param list[list[str]] word_search: The output of `read_input`
+    :return int: The puzzle solution for the given input
+    """
 
     nb_x_mas = 0
+    sample = tracer.sample
     # Go through each character in the word search grid
     for line_nb, line in enumerate(word_search):
         for col_nb, _ in enumerate(line):
             # Check if the pattern is in the grid at this position
             if check_x_mas(word_search, line_nb, col_nb):
                 # The pattern has been found with the 'A' being at that position
-                logger.info(
-                    "The 'X-MAS' pattern was found with the 'A' being at position [%s, %s]",
-                    line_nb,
-                    col_nb,
-                )
                 nb_x_mas += 1
+                if sample:
+                    sample(
+                        "x_mas",
+                        "The 'X-MAS' pattern was found with the 'A' being at position [%s, %s]",
+                        line_nb,
+                        col_nb,
+                    )
+
+    tracer.count("x_mas", nb_x_mas)
 
     # Return the solution
     return nb_x_mas
 
 
-def main() -> None:
+def puzzle2(file: InputSource) -> int:
+    """
+    Solves the second puzzle.
+
+    :param InputSource file: The input file path or stream
+    :return int: The puzzle solution for the given input
+    """
+    # Load the input
+    return solve2(read_input(file))
+
+
+def solve_both(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with a single parse and traversal of the grid.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    # Load the input
+    word_search = read_input(file)
+
+    nb_xmas = 0
+    nb_x_mas = 0
+    # Go through each character in the word search grid
+    for line_nb, line in enumerate(word_search):
+        for col_nb, _ in enumerate(line):
+            # Check the word 'XMAS' in each direction from this position
+            for direction in DIRECTIONS.values():
+                if check_word_in_direction(
+                    word_search, line_nb, col_nb, direction, XMAS_CHARS.copy()
+                ):
+                    nb_xmas += 1
+            # Check the 'X-MAS' pattern around this position
+            if check_x_mas(word_search, line_nb, col_nb):
+                nb_x_mas += 1
+
+    tracer.count("xmas", nb_xmas)
+    tracer.count("x_mas", nb_x_mas)
+
+    # Return the solutions
+    return nb_xmas, nb_x_mas
+
+
+class WordSearch:
+    """
+    A word search grid that keeps its 'XMAS' and 'X-MAS' counts up to date
+    while its cells are edited.
+
+    A cell only belongs to the 'XMAS' words starting up to 3 cells away from it
+    in each direction and to the 'X-MAS' patterns centred next to it: an edit
+    only checks these positions again, whatever the size of the grid.
+    """
+
+    __slots__ = ("grid", "nb_xmas", "nb_x_mas")
+
+    def __init__(self, word_search: list[list[str]]) -> None:
+        """
+        Index a grid, counting all its matches once.
+
+        :param list[list[str]] word_search: The output of `read_input`, copied
+        """
+        self.grid = [list(line) for line in word_search]
+        self.nb_xmas = solve1(self.grid)
+        self.nb_x_mas = solve2(self.grid)
+
+    @classmethod
+    def from_input(cls, file: InputSource) -> "WordSearch":
+        """
+        Read and index an input.
+
+        :param InputSource file: The input file path or stream
+        :return WordSearch: The indexed grid
+        """
+        return cls(read_input(file))
+
+    def _count_around(self, line_nb: int, col_nb: int) -> tuple[int, int]:
+        """
+        Count the matches going through a cell.
+
+        :param int line_nb: The line number of the cell
+        :param int col_nb: The column number of the cell
+        :return tuple[int, int]: The number of 'XMAS' words containing the cell
+        and of 'X-MAS' patterns containing it
+        """
+        grid = self.grid
+        nb_lines = len(grid)
+        nb_cols = len(grid[0])
+
+        nb_xmas = 0
+        for direction in DIRECTIONS.values():
+            for char_nb in range(len(XMAS_CHARS)):
+                # The word would start `char_nb` cells back in that direction
+                start_line_nb = line_nb - char_nb * direction[0]
+                start_col_nb = col_nb - char_nb * direction[1]
+                if (
+                    0 <= start_line_nb < nb_lines
+                    and 0 <= start_col_nb < nb_cols
+                    and check_word_in_direction(
+                        grid,
+                        start_line_nb,
+                        start_col_nb,
+                        direction,
+                        XMAS_CHARS.copy(),
+                    )
+                ):
+                    nb_xmas += 1
+
+        nb_x_mas = 0
+        # The pattern centre is the cell or one of its neighbours
+        for centre_line_nb in range(max(line_nb - 1, 0), min(line_nb + 2, nb_lines)):
+            for centre_col_nb in range(max(col_nb - 1, 0), min(col_nb + 2, nb_cols)):
+                if check_x_mas(grid, centre_line_nb, centre_col_nb):
+                    nb_x_mas += 1
+
+        return nb_xmas, nb_x_mas
+
+    def set_cell(self, line_nb: int, col_nb: int, char: str) -> None:
+        """
+        Change a character of the grid and update the counts.
+
+        :param int line_nb: The line number of the cell
+        :param int col_nb: The column number of the cell
+        :param str char: The new character
+        :raises IndexError: If the cell is out of the grid
+        """
+        if not (0 <= line_nb < len(self.grid) and 0 <= col_nb < len(self.grid[0])):
+            raise IndexError(f"Cell [{line_nb}, {col_nb}] is out of the grid")
+        if self.grid[line_nb][col_nb] == char:
+            return
+
+        # Replace the matches through the cell by the ones with the new character
+        old_xmas, old_x_mas = self._count_around(line_nb, col_nb)
+        self.grid[line_nb][col_nb] = char
+        new_xmas, new_x_mas = self._count_around(line_nb, col_nb)
+        self.nb_xmas += new_xmas - old_xmas
+        self.nb_x_mas += new_x_mas - old_x_mas
+
+        tracer.count("cell_updates")
+
+
+class RegionIndex:
+    """
+    Counts of the 'XMAS' and 'X-MAS' matches inside any rectangle of a grid.
+
+    The grid is scanned once into a map of the match starts for each direction
+    of the word 'XMAS' and a map of the 'X-MAS' centres, each stored as a 2D
+    prefix sum: the matches in a rectangle are then added up from 4 values per
+    map. A word lies inside a rectangle when it starts in the rectangle shrunk
+    by the word length on the sides it goes towards, a pattern when its centre
+    is in the rectangle shrunk by 1 on every side. The counts are the ones of
+    the grid cropped to the rectangle.
+
+    The rectangles are given like slices: `(line_start, col_start, line_stop,
+    col_stop)`, the stops being excluded.
+
+    The rows shorter than the longest one (e.g. the empty line ending an input)
+    are padded with '.', like in `solve_lines`.
+    """
+
+    __slots__ = ("nb_lines", "nb_cols", "xmas_sums", "x_mas_sums", "shrinks")
+
+    def __init__(self, word_search: list[list[str]]) -> None:
+        """
+        Build the index of a grid.
+
+        :param list[list[str]] word_search: The output of `read_input`
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        self.nb_lines = len(word_search)
+        self.nb_cols = max(map(len, word_search), default=0)
+        grid = np.array(
+            [line + ["."] * (self.nb_cols - len(line)) for line in word_search],
+            dtype="U1",
+        ).reshape(self.nb_lines, self.nb_cols)
+        reach = len(XMAS_CHARS) - 1
+
+        # Map of the starts of the word for each direction
+        start_maps = []
+        for line_step, col_step in DIRECTIONS.values():
+            start_map = np.ones(grid.shape, dtype=bool)
+            for char_nb, char in enumerate(XMAS_CHARS):
+                start_map &= self._shift(
+                    grid == char, char_nb * line_step, char_nb * col_step
+                )
+            start_maps.append(start_map)
+        self.xmas_sums = self._prefix_sums(np.stack(start_maps))
+        # How much each side of a rectangle is shrunk for the words of each
+        # direction: top, left, bottom, right
+        self.shrinks = np.array(
+            [
+                (
+                    max(-line_step, 0) * reach,
+                    max(-col_step, 0) * reach,
+                    max(line_step, 0) * reach,
+                    max(col_step, 0) * reach,
+                )
+                for line_step, col_step in DIRECTIONS.values()
+            ]
+        )
+
+        # Map of the centres of the pattern
+        centre_map = grid == "A"
+        for line_step, col_step in ((1, 1), (1, -1)):
+            first = self._shift(grid, -line_step, -col_step)
+            last = self._shift(grid, line_step, col_step)
+            centre_map &= ((first == "M") & (last == "S")) | (
+                (first == "S") & (last == "M")
+            )
+        self.x_mas_sums = self._prefix_sums(centre_map[np.newaxis])
+
+        tracer.count("region_indexes")
+
+    @classmethod
+    def from_input(cls, file: InputSource) -> RegionIndex:
+        """
+        Read and index an input.
+
+        :param InputSource file: The input file path or stream
+        :return RegionIndex: The index
+        """
+        return cls(read_input(file))
+
+    @staticmethod
+    def _shift(grid: np.ndarray, line_shift: int, col_shift: int) -> np.ndarray:
+        """
+        Get the cells `(line_shift, col_shift)` away from each cell of a grid.
+
+        :param np.ndarray grid: The grid
+        :param int line_shift: The line offset
+        :param int col_shift: The column offset
+        :return np.ndarray: The shifted grid, empty (zeros) where the shifted
+        cell is out of the grid
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        nb_lines, nb_cols = grid.shape
+        shifted = np.zeros_like(grid)
+        if abs(line_shift) >= nb_lines or abs(col_shift) >= nb_cols:
+            return shifted
+        shifted[
+            max(-line_shift, 0) : nb_lines - max(line_shift, 0),
+            max(-col_shift, 0) : nb_cols - max(col_shift, 0),
+        ] = grid[
+            max(line_shift, 0) : nb_lines - max(-line_shift, 0),
+            max(col_shift, 0) : nb_cols - max(-col_shift, 0),
+        ]
+        return shifted
+
+    @staticmethod
+    def _prefix_sums(maps: np.ndarray) -> np.ndarray:
+        """
+        Get the 2D prefix sums of boolean maps.
+
+        :param np.ndarray maps: The maps, of shape `(nb_maps, lines, cols)`
+        :return np.ndarray: The sums of the maps before each cell, of shape
+        `(nb_maps, lines + 1, cols + 1)`
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        nb_maps, nb_lines, nb_cols = maps.shape
+        sums = np.zeros((nb_maps, nb_lines + 1, nb_cols + 1), dtype=np.int64)
+        np.cumsum(maps, axis=1, out=sums[:, 1:, 1:])
+        np.cumsum(sums[:, 1:, 1:], axis=2, out=sums[:, 1:, 1:])
+        return sums
+
+    def _region_sums(self, sums: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """
+        Add up prefix summed maps in rectangles.
+
+        :param np.ndarray sums: The prefix sums, of shape `(nb_maps, ...)`
+        :param np.ndarray rects: The rectangles of each map, of shape
+        `(nb_maps, nb_rects, 4)`
+        :return np.ndarray: The total of all the maps in each rectangle
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        line_starts = np.clip(rects[..., 0], 0, self.nb_lines)
+        col_starts = np.clip(rects[..., 1], 0, self.nb_cols)
+        # Empty rectangles have their stops on their starts
+        line_stops = np.clip(rects[..., 2], line_starts, self.nb_lines)
+        col_stops = np.clip(rects[..., 3], col_starts, self.nb_cols)
+        map_nbs = np.arange(len(sums))[:, np.newaxis]
+        return (
+            sums[map_nbs, line_stops, col_stops]
+            - sums[map_nbs, line_starts, col_stops]
+            - sums[map_nbs, line_stops, col_starts]
+            + sums[map_nbs, line_starts, col_starts]
+        ).sum(axis=0)
+
+    def count_many(self, rects: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count the matches inside many rectangles at once.
+
+        :param np.ndarray rects: The rectangles, of shape `(nb_rects, 4)`
+        :return tuple[np.ndarray, np.ndarray]: The number of 'XMAS' words and of
+        'X-MAS' patterns inside each rectangle
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        # Move the starts of the rectangles forward and their stops backward
+        signs = np.array([1, 1, -1, -1])
+        xmas_rects = rects + (self.shrinks * signs)[:, np.newaxis, :]
+        x_mas_rects = rects + signs
+
+        tracer.count("region_queries", len(rects))
+
+        return (
+            self._region_sums(self.xmas_sums, xmas_rects),
+            self._region_sums(self.x_mas_sums, x_mas_rects[np.newaxis]),
+        )
+
+    def count(
+        self, line_start: int, col_start: int, line_stop: int, col_stop: int
+    ) -> tuple[int, int]:
+        """
+        Count the matches inside a rectangle.
+
+        :param int line_start: The first line of the rectangle
+        :param int col_start: The first column of the rectangle
+        :param int line_stop: The line after the last one
+        :param int col_stop: The column after the last one
+        :return tuple[int, int]: The number of 'XMAS' words and of 'X-MAS'
+        patterns inside the rectangle
+        """
+        nb_xmas, nb_x_mas = self.count_many(
+            [(line_start, col_start, line_stop, col_stop)]
+        )
+        return int(nb_xmas[0]), int(nb_x_mas[0])
+
+
+def count_words(lines: list[str], word: str) -> int:
+    """
+    Count the occurrences of a word, read forwards or backwards, in lines.
+
+    :param list[str] lines: The lines of characters
+    :param str word: The word, that can not overlap itself
+    :return int: The number of occurrences
+    """
+    reversed_word = word[::-1]
+    return sum(line.count(word) + line.count(reversed_word) for line in lines)
+
+
+def solve_lines(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with string searches rather than cell by cell checks.
+
+    The word 'XMAS' is counted in the rows, columns and diagonals of the grid
+    with `str.count`. The 'X-MAS' patterns are searched around each 'A' found
+    with `str.find`.
+
+    The rows shorter than the longest one (e.g. the empty line ending an input)
+    are padded with '.', a character that is in no word.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    with open_input(file) as in_file:
+        rows = [line.strip() for line in in_file]
+    nb_lines = len(rows)
+    nb_cols = max(map(len, rows), default=0)
+    rows = [row.ljust(nb_cols, ".") for row in rows]
+
+    # Gather the columns and the diagonals in both directions
+    columns = ["".join(column) for column in zip(*rows)]
+    diagonals = [
+        "".join(
+            rows[line_nb][line_nb - shift]
+            for line_nb in range(max(shift, 0), min(nb_lines, nb_cols + shift))
+        )
+        for shift in range(1 - nb_cols, nb_lines)
+    ]
+    anti_diagonals = [
+        "".join(
+            rows[line_nb][total - line_nb]
+            for line_nb in range(max(0, total - nb_cols + 1), min(nb_lines, total + 1))
+        )
+        for total in range(nb_lines + nb_cols - 1)
+    ]
+    word = "".join(XMAS_CHARS)
+    nb_xmas = sum(
+        count_words(lines, word) for lines in (rows, columns, diagonals, anti_diagonals)
+    )
+
+    # Check the corners of each 'A' that is not on the border of the grid
+    nb_x_mas = 0
+    for line_nb in range(1, nb_lines - 1):
+        above, line, below = rows[line_nb - 1], rows[line_nb], rows[line_nb + 1]
+        col_nb = line.find("A", 1, nb_cols - 1)
+        while col_nb != -1:
+            if (
+                above[col_nb - 1] + below[col_nb + 1] in X_MAS_DIAGONALS
+                and above[col_nb + 1] + below[col_nb - 1] in X_MAS_DIAGONALS
+            ):
+                nb_x_mas += 1
+            col_nb = line.find("A", col_nb + 1, nb_cols - 1)
+
+    tracer.count("xmas", nb_xmas)
+    tracer.count("x_mas", nb_x_mas)
+
+    # Return the solutions
+    return nb_xmas, nb_x_mas
+
+
+# Engines solving both puzzles, from the most general to the most specialized
+# (see `aoc.engines`)
+ENGINES = {
+    "fused": Engine(solve_both),
+    "lines": Engine(solve_lines),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
     """
     Main function
+
+    :param list[str] | None argv: The command line arguments, defaults to
+    `sys.argv[1:]`
     """
-    ### First part of the problem
-    res1 = puzzle1(INPUT)
-    print(f"First part result : {res1}")
+    # pylint: disable-next=import-outside-toplevel
+    from aoc.cli import parse_day_args
 
-    ### Second part of the problem
-    res2 = puzzle2(INPUT)
+    args = parse_day_args(__doc__, input_path(__file__, INPUT_FILES["INPUT"]), argv)
+    configure_logging(args.log_level, args.trace_sample, args.trace_summary)
+    input_file = args.file
+
+    ### Both parts of the problem, with the selected engine
+    res1, res2 = solve_with_engine(
+        sys.modules[__name__], input_file, args.engine, args.check_rate
+    )
+    print(f"First part result : {res1}")
     print(f"Second part result : {res2}")
+    tracer.summarize(logging.INFO)
 
 
 if __name__ == "__main__":
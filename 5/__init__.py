@@ -0,0 +1 @@
+"""Day 5 puzzle solutions."""
@@ -1,50 +1,71 @@
 """Day I puzzle solutions."""
 
 import logging
-from os.path import dirname
-from os.path import join as pathjoin
-
-# Load and configure the logger
-LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
-logging.basicConfig(
-    level=logging.INFO, handlers=[logging.StreamHandler()], format=LOG_FORMAT
-)
+import sys
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+from functools import cmp_to_key
+from itertools import pairwise
+from os.path import abspath, dirname
+
+if __package__ in (None, ""):
+    # Running as a script, make the shared `aoc` package importable
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from aoc.days import input_path
+from aoc.engines import Engine, solve_with_engine
+from aoc.inputs import InputSource, open_input
+from aoc.ragged import RaggedArray
+from aoc.tracing import configure_logging, get_tracer
+
+# Load the logger and the tracer (configured by the entry point)
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
-# Constants for the input paths
-INPUT_FOLDER = pathjoin(dirname(__file__), "inputs")
-SMALL_INPUT = pathjoin(INPUT_FOLDER, "small_input")
-INPUT = pathjoin(INPUT_FOLDER, "input")
+# Input file names, the paths are resolved on access (see `__getattr__`)
+INPUT_FILES = {
+    "SMALL_INPUT": "small_input",
+    "INPUT": "input",
+}
 
 
-def read_input(file: str) -> tuple[dict[int, list[int]], list[list[int]]]:
+def __getattr__(name: str) -> str:
+    """
+    Resolve the input path constants (`INPUT`, `SMALL_INPUT`...) on access.
+
+    :param str name: The constant name
+    :raises AttributeError: If the name is not an input constant
+    :return str: The input file path
+    """
+    if name in INPUT_FILES:
+        return input_path(__file__, INPUT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def read_input(file: InputSource) -> tuple[dict[int, list[int]], RaggedArray]:
     """
     Read the input file and format the content to ordering rules and updates.
 
     The output format is a tuple containing:
     - a dict representing the ordering rules: each key is a page and the value
     is the list of pages it can not precede
-    - a list of updates: each update is the list of pages in the order of impression
-
-    :param str file: The input file name
-    :return tuple[dict[int, list[int]], list[list[int]]]: The formatted output
-    """
-    # Open the file
-    with open(file, "r", encoding="utf-8") as in_file:
-        lines = map(lambda file_line: file_line.strip(), in_file.readlines())
-
-    ordering_rules: dict[int, list[int]] = {}
-    updates = []
-    # Start by reading ordering rule block
-    ordering_rule_block = True
-    # Go through each line
-    for line in lines:
-        if not line:
-            # Finished reading the ordering block, start reading the updates
-            ordering_rule_block = False
-            continue
-
-        if ordering_rule_block:
+    - a ragged array of updates: each update (row) is the list of pages in the
+    order of impression
+
+    :param InputSource file: The input file path or stream
+    :return tuple[dict[int, list[int]], RaggedArray]: The formatted output
+    """
+    # Open the file and read it line by line
+    with open_input(file) as in_file:
+        lines = map(lambda file_line: file_line.strip(), in_file)
+
+        ordering_rules: dict[int, list[int]] = {}
+        # Start by reading ordering rule block
+        for line in lines:
+            if not line:
+                # Finished reading the ordering block, start reading the updates
+                break
+
             # Reading an ordering rule line
             # Get the page numbers of the rule
             first_page, second_page = [int(page) for page in line.split("|")]
@@ -54,26 +75,23 @@ def read_input(file: str) -> tuple[dict[int, list[int]], list[list[int]]]:
             else:
                 # The succeeding page had no rules yet
                 ordering_rules[second_page] = [first_page]
-        else:
-            # Reading an update line
-            # Add the update to the update list
-            update = [int(page) for page in line.split(",")]
-            updates.append(update)
+
+        # Read the rest of the input (non-empty lines) as updates, by blocks
+        updates = RaggedArray.parse(in_file, ",", skip_empty=True)
 
     return ordering_rules, updates
 
 
 def check_update_validity(
-    ordering_rules: dict[int, list[int]], update: list[int]
+    ordering_rules: Mapping[int, Collection[int]], update: Sequence[int]
 ) -> bool:
     """
     Check if an update is valid according to ordering rules.
 
-    :param dict[int, list[int]] ordering_rules: The ordering rule
-    :param list[int] update: The update to check
+    :param Mapping[int, Collection[int]] ordering_rules: The ordering rule
+    :param Sequence[int] update: The update to check
     :return bool: `True` if the update is valid, `False` if not
     """
-    logger.debug("Checking update: %s", update)
     # Go through each page in the update list
     for page_id, page in enumerate(update):
         # Get the list of pages the current page can not preceed
@@ -83,25 +101,19 @@ def check_update_validity(
             # the current page in the rest of the list
             if cant_preceed_page in update[page_id + 1 :]:
                 # An ordering rule was not respected
-                logger.debug(
-                    "An ordering rule was not respected: %s comes before %s",
-                    page,
-                    cant_preceed_page,
-                )
                 return False
 
     # The whole list was checked and no rule was broken
-    logger.debug("The update %s is valid", update)
     return True
 
 
-def get_updates_score(updates: list[int]) -> int:
+def get_updates_score(updates: Iterable[Sequence[int]]) -> int:
     """
     Get the score from a list of updates.
 
     The score is obtained by adding up the middle value of each update.
 
-    :param list[int] updates: The list of updates to consider
+    :param Iterable[Sequence[int]] updates: The updates to consider
     :return int: The score
     """
     updates_score = 0
@@ -114,13 +126,13 @@ def get_updates_score(updates: list[int]) -> int:
 
 
 def reorder_update(
-    ordering_rules: dict[int, list[int]], update: list[int]
+    ordering_rules: Mapping[int, Collection[int]], update: Sequence[int]
 ) -> list[int]:
     """
     Re-orders the update accordingly to ordering rules.
 
-    :param dict[int, list[int]] ordering_rules: The ordering rule
-    :param list[int] update: The update to re-order
+    :param Mapping[int, Collection[int]] ordering_rules: The ordering rule
+    :param Sequence[int] update: The update to re-order
     :return list[int]: The ordered update
     """
     ordered_update = [update[0]]
@@ -146,15 +158,15 @@ def reorder_update(
     return ordered_update
 
 
-def puzzle1(file: str) -> int:
+def solve1(parsed_input: tuple[dict[int, list[int]], RaggedArray]) -> int:
     """
-    Solves the first puzzle.
+    Solves the first puzzle on a parsed input.
 
-    :param str file: The input file
+    :param tuple[dict[int, list[int]], RaggedArray] parsed_input: The output
+    of `read_input`
     :return int: The puzzle solution for the given input
     """
-    # Load the input
-    ordering_rules, updates = read_input(file)
+    ordering_rules, updates = parsed_input
 
     valid_updates = []
     # Go through each update
@@ -163,19 +175,33 @@ def puzzle1(file: str) -> int:
             # The update is valid, add it to the valid updates list
             valid_updates.append(update)
 
+    tracer.count("updates", len(updates))
+    tracer.count("valid_updates", len(valid_updates))
+
     # Return the solution
     return get_updates_score(valid_updates)
 
 
-def puzzle2(file: str) -> int:
+def puzzle1(file: InputSource) -> int:
     """
-    Solves the second puzzle.
+    Solves the first puzzle.
 
-    :param str file: The input file
+    :param InputSource file: The input file path or stream
     :return int: The puzzle solution for the given input
     """
     # Load the input
-    ordering_rules, updates = read_input(file)
+    return solve1(read_input(file))
+
+
+def solve2(parsed_input: tuple[dict[int, list[int]], RaggedArray]) -> int:
+    """
+    Solves the second puzzle on a parsed input.
+
+    :param tuple[dict[int, list[int]], RaggedArray] parsed_input: The output
+    of `read_input`
+    :return int: The puzzle solution for the given input
+    """
+    ordering_rules, updates = parsed_input
 
     invalid_updates = []
     # Go through each update
@@ -185,28 +211,388 @@ def puzzle2(file: str) -> int:
             invalid_updates.append(update)
 
     reordered_updates = []
+    sample = tracer.sample
     # Go through each invalid update
     for update in invalid_updates:
         # Re-order the invalid update
         reordered_update = reorder_update(ordering_rules, update)
-        logger.debug("%s has been re-ordered to %s", update, reordered_update)
+        if sample:
+            sample(
+                "reordered",
+                "%s has been re-ordered to %s",
+                update.tolist(),
+                reordered_update,
+            )
         reordered_updates.append(reordered_update)
 
+    tracer.count("updates", len(updates))
+    tracer.count("reordered_updates", len(reordered_updates))
+
     # Return the solution
     return get_updates_score(reordered_updates)
 
 
-def main() -> None:
+def puzzle2(file: InputSource) -> int:
+    """
+    Solves the second puzzle.
+
+    :param InputSource file: The input file path or stream
+    :return int: The puzzle solution for the given input
+    """
+    # Load the input
+    return solve2(read_input(file))
+
+
+def solve_both(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with a single parse and validity check of the updates.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    # Load the input
+    ordering_rules, updates = read_input(file)
+
+    # Split the updates between valid and invalid ones
+    valid_updates = []
+    invalid_updates = []
+    for update in updates:
+        if check_update_validity(ordering_rules, update):
+            valid_updates.append(update)
+        else:
+            invalid_updates.append(update)
+
+    # Re-order the invalid updates
+    reordered_updates = [
+        reorder_update(ordering_rules, update) for update in invalid_updates
+    ]
+
+    tracer.count("updates", len(updates))
+    tracer.count("valid_updates", len(valid_updates))
+    tracer.count("reordered_updates", len(reordered_updates))
+
+    # Return the solutions
+    return get_updates_score(valid_updates), get_updates_score(reordered_updates)
+
+
+def solve_sorted(file: InputSource) -> tuple[int, int]:
+    """
+    Solves both puzzles with set lookups of the rules and a sort of the invalid
+    updates.
+
+    The sort gives the order of `reorder_update` when the rules order every pair
+    of pages of an invalid update, as in the puzzle inputs. The other invalid
+    updates are reordered with `reorder_update`.
+
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    # Load the input
+    ordering_rules, updates = read_input(file)
+    # The (preceding page, succeeding page) pairs of the rules
+    rule_pairs = {
+        (first_page, second_page)
+        for second_page, first_pages in ordering_rules.items()
+        for first_page in first_pages
+    }
+
+    def compare_pages(page_1: int, page_2: int) -> int:
+        if (page_1, page_2) in rule_pairs:
+            return -1
+        if (page_2, page_1) in rule_pairs:
+            return 1
+        return 0
+
+    valid_score = 0
+    reordered_score = 0
+    for update in updates:
+        # The update is invalid if a page is followed by a page that must
+        # precede it
+        if any(
+            (later_page, page) in rule_pairs
+            for page_id, page in enumerate(update)
+            for later_page in update[page_id + 1 :]
+        ):
+            if all(
+                (page, later_page) in rule_pairs or (later_page, page) in rule_pairs
+                for page_id, page in enumerate(update)
+                for later_page in update[page_id + 1 :]
+            ):
+                reordered_update = sorted(update, key=cmp_to_key(compare_pages))
+            else:
+                # Pages without a rule between them, the sort order is undefined
+                reordered_update = reorder_update(ordering_rules, update)
+            reordered_score += reordered_update[len(reordered_update) // 2]
+        else:
+            valid_score += update[len(update) // 2]
+
+    # Return the solutions
+    return valid_score, reordered_score
+
+
+class Rulebook:
+    """
+    Ordering rules that can be changed between the checks of updates.
+
+    While the rules have no cycle, the rulebook keeps a rank of each page
+    consistent with all of them (a topological order): an update whose pages
+    have increasing ranks is valid, and sorting an update by rank reorders it.
+    Adding a rule only moves the pages ranked between its two pages that the
+    rule constrains, and finds a cycle the rule closes while doing so. Removing
+    a rule keeps the ranks consistent. Once the rules have a cycle, the updates
+    are checked and reordered from the rules directly, and the ranks are only
+    computed again after a rule is removed.
+    """
+
+    __slots__ = ("predecessors", "successors", "rank", "_next_rank", "_stale")
+
+    def __init__(self, ordering_rules: dict[int, list[int]] | None = None) -> None:
+        """
+        Create a rulebook.
+
+        :param dict[int, list[int]] | None ordering_rules: The rules read by
+        `read_input`, defaults to None (no rule)
+        """
+        # For each page, the pages that must precede it and the ones that must
+        # succeed it
+        self.predecessors: dict[int, set[int]] = {}
+        self.successors: dict[int, set[int]] = {}
+        # The rank of each page with rules, `None` if the rules have a cycle
+        self.rank: dict[int, int] | None = {}
+        self._next_rank = 0
+        # Whether the ranks must be computed again from all the rules
+        self._stale = False
+
+        for second_page, first_pages in (ordering_rules or {}).items():
+            for first_page in first_pages:
+                self._link(first_page, second_page)
+        self._rank_all()
+
+    def _link(self, first_page: int, second_page: int) -> None:
+        """
+        Record a rule, without ranking its pages.
+
+        :param int first_page: The page that must precede
+        :param int second_page: The page that must succeed
+        """
+        self.predecessors.setdefault(first_page, set())
+        self.successors.setdefault(first_page, set()).add(second_page)
+        self.predecessors.setdefault(second_page, set()).add(first_page)
+        self.successors.setdefault(second_page, set())
+
+    def _rank_all(self) -> None:
+        """
+        Rank all the pages from the rules (Kahn's algorithm).
+        """
+        nb_predecessors = {
+            page: len(predecessors) for page, predecessors in self.predecessors.items()
+        }
+        ready = [page for page, nb_left in nb_predecessors.items() if not nb_left]
+        rank = {}
+        while ready:
+            page = ready.pop()
+            rank[page] = len(rank)
+            for next_page in self.successors[page]:
+                nb_predecessors[next_page] -= 1
+                if not nb_predecessors[next_page]:
+                    ready.append(next_page)
+
+        # Pages left unranked are on a cycle
+        self.rank = rank if len(rank) == len(nb_predecessors) else None
+        self._next_rank = len(rank)
+        self._stale = False
+        tracer.count("full_rankings")
+
+    def _rank_new_page(self, page: int) -> None:
+        """
+        Rank a page without rules after all the others.
+
+        :param int page: The page
+        """
+        if self.rank is not None and page not in self.rank:
+            self.rank[page] = self._next_rank
+            self._next_rank += 1
+
+    def _reachable(
+        self, page: int, links: dict[int, set[int]], in_bounds: Callable[[int], bool]
+    ) -> set[int]:
+        """
+        Get the pages reachable from a page by following links, among the pages
+        whose rank is in bounds.
+
+        :param int page: The start page
+        :param dict[int, set[int]] links: The successors or the predecessors
+        :param Callable[[int], bool] in_bounds: Tells if a rank is in bounds
+        :return set[int]: The reachable pages, including the start page
+        """
+        rank = self.rank
+        reached = {page}
+        to_visit = [page]
+        while to_visit:
+            for next_page in links[to_visit.pop()]:
+                if next_page not in reached and in_bounds(rank[next_page]):
+                    reached.add(next_page)
+                    to_visit.append(next_page)
+        return reached
+
+    def add_rule(self, first_page: int, second_page: int) -> None:
+        """
+        Add the rule `first_page|second_page`.
+
+        The pages ranked between the two pages that must move are found with a
+        search limited to these ranks (Pearce and Kelly's algorithm), the other
+        ranks are kept.
+
+        :param int first_page: The page that must precede
+        :param int second_page: The page that must succeed
+        """
+        self._link(first_page, second_page)
+        if self.rank is None:
+            # The rules already have a cycle, it is still there
+            return
+        self._rank_new_page(first_page)
+        self._rank_new_page(second_page)
+
+        rank = self.rank
+        lower, upper = rank[second_page], rank[first_page]
+        if lower > upper:
+            # The pages are already ranked in that order
+            return
+
+        # The pages after the second page that are not ranked after the first
+        # page yet, a cycle if the first page is one of them
+        moved_forward = self._reachable(
+            second_page, self.successors, lambda page_rank: page_rank <= upper
+        )
+        if first_page in moved_forward:
+            logger.debug("The rule %s|%s closes a cycle", first_page, second_page)
+            self.rank = None
+            return
+        # The pages before the first page that are not ranked before the second
+        # page yet
+        moved_back = self._reachable(
+            first_page, self.predecessors, lambda page_rank: page_rank >= lower
+        )
+
+        # Give their ranks back to these pages, the ones moved back first
+        ranks = sorted(rank[page] for page in moved_forward | moved_back)
+        moved = sorted(moved_back, key=rank.__getitem__) + sorted(
+            moved_forward, key=rank.__getitem__
+        )
+        for page, page_rank in zip(moved, ranks):
+            rank[page] = page_rank
+
+        tracer.count("reranked_pages", len(moved))
+
+    def remove_rule(self, first_page: int, second_page: int) -> None:
+        """
+        Remove the rule `first_page|second_page`.
+
+        :param int first_page: The page that must precede
+        :param int second_page: The page that must succeed
+        :raises ValueError: If there is no such rule
+        """
+        if second_page not in self.successors.get(first_page, ()):
+            raise ValueError(f"There is no rule {first_page}|{second_page}")
+        self.successors[first_page].remove(second_page)
+        self.predecessors[second_page].remove(first_page)
+        if self.rank is None:
+            # The rule may have been on the cycle
+            self._stale = True
+
+    @property
+    def acyclic(self) -> bool:
+        """
+        Whether the rules have no cycle, i.e. the pages are ranked.
+
+        :return bool: `True` if the rules have no cycle, `False` if not
+        """
+        if self._stale:
+            self._rank_all()
+        return self.rank is not None
+
+    def check_update(self, update: Sequence[int]) -> bool:
+        """
+        Check if an update is valid according to the rules.
+
+        :param Sequence[int] update: The update to check
+        :return bool: `True` if the update is valid, `False` if not
+        """
+        if self.acyclic:
+            rank = self.rank
+            # Pages without rules can be anywhere
+            ranks = [rank[page] for page in update if page in rank]
+            if all(rank_1 < rank_2 for rank_1, rank_2 in pairwise(ranks)):
+                return True
+        # Pages out of rank order can still be unconstrained by a direct rule
+        return check_update_validity(self.predecessors, update)
+
+    def reorder(self, update: Sequence[int]) -> list[int]:
+        """
+        Re-orders an update accordingly to the rules.
+
+        When the rules order every pair of pages of the update, as in the
+        puzzle inputs, the order is the one of `reorder_update`.
+
+        :param Sequence[int] update: The update to re-order
+        :return list[int]: The ordered update
+        """
+        if self.acyclic:
+            rank = self.rank
+            return sorted(update, key=lambda page: rank.get(page, -1))
+        return reorder_update(self.predecessors, update)
+
+    def score_updates(self, updates: Iterable[Sequence[int]]) -> tuple[int, int]:
+        """
+        Get the scores of the valid updates and of the reordered invalid ones.
+
+        :param Iterable[Sequence[int]] updates: The updates
+        :return tuple[int, int]: The solutions of the first and second puzzles
+        for these updates
+        """
+        valid_score = 0
+        reordered_score = 0
+        for update in updates:
+            if self.check_update(update):
+                valid_score += update[len(update) // 2]
+            else:
+                reordered_update = self.reorder(update)
+                reordered_score += reordered_update[len(reordered_update) // 2]
+
+        return valid_score, reordered_score
+
+
+# Engines solving both puzzles, from the most general to the most specialized
+# (see `aoc.engines`)
+ENGINES = {
+    "fused": Engine(solve_both),
+    # Only pays off when the rules order every pair of pages of the invalid
+    # updates, select it with `--engine sort`
+    "sort": Engine(solve_sorted, auto=False),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
     """
     Main function
+
+    :param list[str] | None argv: The command line arguments, defaults to
+    `sys.argv[1:]`
     """
-    ### First part of the problem
-    res1 = puzzle1(INPUT)
-    print(f"First part result : {res1}")
+    # pylint: disable-next=import-outside-toplevel
+    from aoc.cli import parse_day_args
 
-    ### Second part of the problem
-    res2 = puzzle2(INPUT)
+    args = parse_day_args(__doc__, input_path(__file__, INPUT_FILES["INPUT"]), argv)
+    configure_logging(args.log_level, args.trace_sample, args.trace_summary)
+    input_file = args.file
+
+    ### Both parts of the problem, with the selected engine
+    res1, res2 = solve_with_engine(
+        sys.modules[__name__], input_file, args.engine, args.check_rate
+    )
+    print(f"First part result : {res1}")
     print(f"Second part result : {res2}")
+    tracer.summarize(logging.INFO)
 
 
 if __name__ == "__main__":
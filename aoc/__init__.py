@@ -0,0 +1 @@
+"""Shared helpers for the Advent of Code 2024 puzzle solutions."""
@@ -0,0 +1,23 @@
+"""
+Run the solutions of several days in a single interpreter.
+
+Usage: `python -m aoc [DAY ...]` (all the days by default).
+"""
+
+import sys
+
+from aoc.days import DAYS, load_day
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    days = [int(day) for day in sys.argv[1:]] or DAYS
+    for day in days:
+        print(f"--- Day {day} ---")
+        load_day(day).main([])
+
+
+if __name__ == "__main__":
+    main()
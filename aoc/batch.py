@@ -0,0 +1,261 @@
+"""
+Asynchronous batch solving of many inputs.
+
+Reads a manifest of `(day, part, file)` jobs, reads the input files (possibly
+compressed, see `aoc.inputs`) with a bounded number of concurrent reads, hands
+the solving to a process pool and streams the results (one JSON object per
+line) as they complete. The reading pauses while `max_pending` read inputs wait
+for the pool, so that a slow pool does not fill the memory with read inputs.
+
+The manifest has one job per line, `DAY PART FILE`, blank lines and lines
+starting with `#` are ignored. An invalid line is reported as an error result
+and the batch goes on. The jobs of a day are solved with its `puzzle` functions,
+or with one of its engines (see `aoc.engines`) given with `--engine DAY=NAME`,
+e.g. `--engine 2=memoized` keeps the day 2 verdicts cached in each worker. The
+tracer counters of the jobs (e.g. the cache hits and misses) are added up in
+the summary.
+
+Usage: `python -m aoc.batch MANIFEST [--workers N] [--io N] [--max-pending N]
+[--engine DAY=NAME ...]`
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, NamedTuple
+
+from aoc.days import load_day
+from aoc.engines import select_engine
+from aoc.tracing import get_tracer
+
+
+class Job(NamedTuple):
+    """
+    A puzzle part to solve on an input file.
+    """
+
+    day: int
+    part: int
+    file: str
+    # The engine solving the job, `None` for the day's `puzzle` function
+    engine: str | None = None
+
+
+def read_manifest(
+    manifest: str, on_error: Callable[[dict[str, Any]], None] | None = None
+) -> Iterator[Job]:
+    """
+    Read the jobs of a manifest file, lazily.
+
+    :param str manifest: The manifest file name
+    :param Callable[[dict[str, Any]], None] | None on_error: Called with
+    `{"manifest", "line", "error"}` for each invalid line, which is skipped,
+    defaults to None (an invalid line raises)
+    :raises ValueError: If a line is not `DAY PART FILE` and there is no
+    `on_error`
+    :yield Job: The jobs in the manifest order
+    """
+    with open(manifest, "r", encoding="utf-8") as in_file:
+        for line_nb, line in enumerate(in_file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                day, part, file = line.split(maxsplit=2)
+                job = Job(int(day), int(part), file)
+            except ValueError as error:
+                if on_error is None:
+                    raise ValueError(
+                        f"{manifest}:{line_nb}: invalid job {line!r}"
+                    ) from error
+                error_msg = f"invalid job {line!r}, expected 'DAY PART FILE'"
+                on_error({"manifest": manifest, "line": line_nb, "error": error_msg})
+                continue
+            yield job
+
+
+def solve_data(
+    day: int, part: int, data: bytes, engine: str | None = None
+) -> tuple[int, dict[str, int]]:
+    """
+    Solve a part of a day on an input already read. Runs in a worker process.
+
+    :param int day: The day number
+    :param int part: The part number (1 or 2)
+    :param bytes data: The input content, possibly compressed
+    :param str | None engine: The engine name, defaults to None (the day's
+    `puzzle` function)
+    :raises ValueError: If the day has no engine with that name
+    :return tuple[int, dict[str, int]]: The answer and what the job added to
+    the tracer counters of the day
+    """
+    module = load_day(day)
+    counters = get_tracer(module.__name__).counters
+    before = dict(counters)
+    stream = BytesIO(data)
+    if engine is None:
+        answer = getattr(module, f"puzzle{part}")(stream)
+    else:
+        # An engine solves both parts
+        _, solver = select_engine(module, stream, engine)
+        answer = solver.solve(stream)[part - 1]
+
+    added = {
+        event: nb - before.get(event, 0)
+        for event, nb in counters.items()
+        if nb != before.get(event, 0)
+    }
+    return int(answer), added
+
+
+def _read_data(file: str) -> bytes:
+    """
+    Read an input file (blocking, run in a thread).
+
+    :param str file: The input file name
+    :return bytes: The input content
+    """
+    with open(file, "rb") as in_file:
+        return in_file.read()
+
+
+async def run_batch(
+    jobs: Iterable[Job],
+    executor: Executor,
+    on_result: Callable[[dict[str, Any]], None],
+    io_concurrency: int = 16,
+    max_pending: int = 0,
+) -> tuple[int, Counter[str]]:
+    """
+    Solve all the jobs and report each result as soon as it is known.
+
+    :param Iterable[Job] jobs: The jobs to solve
+    :param Executor executor: The pool the puzzles are solved in
+    :param Callable[[dict[str, Any]], None] on_result: Called with the result of
+    each job, `{"day", "part", "file", "engine", "answer"}` or `{..., "error"}`
+    :param int io_concurrency: The maximum number of files read at once,
+    defaults to 16
+    :param int max_pending: The maximum number of jobs submitted to the pool at
+    once, as many read inputs can wait for a slot, defaults to 2 per CPU
+    :return tuple[int, Counter[str]]: The number of jobs in the batch and the
+    tracer counters added up over its jobs
+    """
+    loop = asyncio.get_running_loop()
+    job_iter = iter(jobs)
+    max_pending = max_pending or 2 * (os.cpu_count() or 1)
+    # Read inputs waiting for the pool, `None` tells a solver to stop
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    nb_jobs = 0
+    counters: Counter[str] = Counter()
+
+    async def reader() -> None:
+        nonlocal nb_jobs
+        # The jobs iterator is shared by all the readers
+        for job in job_iter:
+            nb_jobs += 1
+            try:
+                data = await asyncio.to_thread(_read_data, job.file)
+            except OSError as error:
+                on_result({**job._asdict(), "error": str(error)})
+                continue
+            # Blocks when the pool is behind (back-pressure)
+            await pending.put((job, data))
+
+    async def solver() -> None:
+        while (item := await pending.get()) is not None:
+            job, data = item
+            try:
+                answer, job_counters = await loop.run_in_executor(
+                    executor, solve_data, job.day, job.part, data, job.engine
+                )
+                counters.update(job_counters)
+                on_result({**job._asdict(), "answer": answer})
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # A failing job must not stop the batch
+                error_msg = f"{type(error).__name__}: {error}"
+                on_result({**job._asdict(), "error": error_msg})
+
+    solvers = [asyncio.create_task(solver()) for _ in range(max_pending)]
+    await asyncio.gather(*(reader() for _ in range(io_concurrency)))
+    for _ in solvers:
+        await pending.put(None)
+    await asyncio.gather(*solvers)
+
+    return nb_jobs, counters
+
+
+def parse_engine_option(value: str) -> tuple[int, str]:
+    """
+    Parse an `--engine DAY=NAME` option.
+
+    :param str value: The option value
+    :raises argparse.ArgumentTypeError: If the value is not `DAY=NAME`
+    :return tuple[int, str]: The day number and the engine name
+    """
+    day, _, name = value.partition("=")
+    if not day.isdigit() or not name:
+        raise argparse.ArgumentTypeError(f"expected DAY=NAME, got {value!r}")
+    return int(day), name
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("manifest", help="one 'DAY PART FILE' job per line")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes")
+    parser.add_argument("--io", type=int, default=16, help="concurrent file reads")
+    parser.add_argument("--max-pending", type=int, default=0)
+    parser.add_argument(
+        "--engine",
+        type=parse_engine_option,
+        action="append",
+        default=[],
+        metavar="DAY=NAME",
+        help="solve the jobs of a day with this engine",
+    )
+    args = parser.parse_args()
+    engines = dict(args.engine)
+
+    def print_result(result: dict[str, Any]) -> None:
+        print(json.dumps(result), flush=True)
+
+    start = time.perf_counter()
+    jobs = (
+        job._replace(engine=engines.get(job.day))
+        for job in read_manifest(args.manifest, print_result)
+    )
+    with ProcessPoolExecutor(args.workers or None) as executor:
+        nb_jobs, counters = asyncio.run(
+            run_batch(
+                jobs,
+                executor,
+                print_result,
+                args.io,
+                args.max_pending,
+            )
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{nb_jobs} jobs in {elapsed:.2f} s ({nb_jobs / elapsed:.1f} jobs/s)",
+        file=sys.stderr,
+    )
+    lookups = counters["cache_hits"] + counters["cache_misses"]
+    if lookups:
+        print(
+            f"cache: {counters['cache_hits']} hits, {counters['cache_misses']} "
+            f"misses ({100 * counters['cache_hits'] / lookups:.1f}% hit rate)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Command line of the day modules.
+
+Imported by the `main()` functions only, so that importing a day module does
+not import `argparse`.
+"""
+
+import argparse
+
+
+def parse_day_args(
+    description: str, default_input: str, argv: list[str] | None = None
+) -> argparse.Namespace:
+    """
+    Parse the command line arguments of a day.
+
+    :param str description: The description of the command
+    :param str default_input: The input file used when none is given
+    :param list[str] | None argv: The arguments, defaults to `sys.argv[1:]`
+    :return argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "file",
+        nargs="?",
+        default=default_input,
+        help="the input file, possibly gzip/bzip2/xz compressed, '-' for the "
+        "standard input (default: the day's inputs/input)",
+    )
+    parser.add_argument(
+        "--engine", help="the solving engine (default: selected from the input size)"
+    )
+    parser.add_argument(
+        "--check-rate",
+        type=float,
+        default=0.0,
+        help="fraction of the runs also solved by the reference engine to check "
+        "the selected one (default: 0)",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        default="INFO",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        help="the log level (default: INFO)",
+    )
+    parser.add_argument(
+        "--trace-sample",
+        type=int,
+        default=0,
+        metavar="N",
+        help="log one detailed event out of N, needs --log-level DEBUG "
+        "(default: 0, disabled)",
+    )
+    parser.add_argument(
+        "--trace-summary",
+        type=int,
+        default=0,
+        metavar="N",
+        help="log the counters each time one of them goes past a multiple of N, "
+        "needs --log-level DEBUG (default: 0, only the final summary)",
+    )
+    return parser.parse_args(argv)
@@ -0,0 +1,39 @@
+"""
+Lazy access to the day modules.
+
+The day folders (`1/`, `2/`...) are packages whose names are not valid
+identifiers, they are imported with `importlib` from the repository root.
+Nothing is imported or configured until a day is actually requested.
+"""
+
+import importlib
+from os.path import dirname
+from os.path import join as pathjoin
+from types import ModuleType
+
+# The days that have a solution
+DAYS = (1, 2, 3, 4, 5)
+
+
+def load_day(day: int) -> ModuleType:
+    """
+    Import the solution module of a day (only once).
+
+    :param int day: The day number
+    :raises ValueError: If the day has no solution
+    :return ModuleType: The `main` module of the day
+    """
+    if day not in DAYS:
+        raise ValueError(f"No solution for day {day}")
+    return importlib.import_module(f"{day}.main")
+
+
+def input_path(day_file: str, name: str) -> str:
+    """
+    Get the path of an input file of a day.
+
+    :param str day_file: The `__file__` of the day module
+    :param str name: The input file name (e.g. `small_input`)
+    :return str: The input file path
+    """
+    return pathjoin(dirname(day_file), "inputs", name)
@@ -0,0 +1,226 @@
+"""
+Solving engines of the days.
+
+Each day module lists its engines in `ENGINES`: functions solving both parts of
+the puzzle from an input (a path or a stream), ordered from the most general
+to the most specialized one. Each engine declares the input size (in bytes,
+once decompressed) and the number of cores from which it is worth using, the
+automatic selection picks the last engine whose requirements are met. Engines that do not answer
+like the reference on every input, or only pay off on some inputs, opt out of
+the automatic selection (`auto=False`) and are only used when named.
+
+The `reference` engine, made of the day's `read_input` (or `prepare`) and
+`solve1`/`solve2` functions, is always available. The differential check runs
+it on the same inputs as another engine to verify that engine.
+
+Usage: `python -m aoc.engines DAY [--engine NAME] [--sample N] [FILE ...]`
+checks the engines of a day on the given files (default: the day's inputs).
+"""
+
+import os
+from collections.abc import Callable
+from functools import partial
+from os import PathLike
+from types import ModuleType
+
+from aoc.inputs import InputSource, decompressed_size
+
+# Name of the engine the others are checked against
+REFERENCE = "reference"
+
+
+class Engine:
+    """
+    A function solving both parts of a puzzle, and when it is worth using it.
+    """
+
+    __slots__ = ("solve", "min_size", "min_cores", "auto")
+
+    def __init__(
+        self,
+        solve: Callable[[InputSource], tuple[int, int]],
+        min_size: int = 0,
+        min_cores: int = 1,
+        auto: bool = True,
+    ) -> None:
+        """
+        Create an engine.
+
+        :param Callable[[InputSource], tuple[int, int]] solve: Solves both parts
+        from an input and returns the two answers
+        :param int min_size: Decompressed input size (in bytes) from which the
+        engine is selected, defaults to 0
+        :param int min_cores: Number of cores from which the engine is selected,
+        defaults to 1
+        :param bool auto: `False` if the engine is only used when selected by
+        name, defaults to `True`
+        """
+        self.solve = solve
+        self.min_size = min_size
+        self.min_cores = min_cores
+        self.auto = auto
+
+
+def solve_reference(module: ModuleType, file: InputSource) -> tuple[int, int]:
+    """
+    Solve both parts of a day with its reference functions.
+
+    :param ModuleType module: The day module
+    :param InputSource file: The input file path or stream
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    prepare = getattr(module, "prepare", module.read_input)
+    prepared = prepare(file)
+    return int(module.solve1(prepared)), int(module.solve2(prepared))
+
+
+def get_engines(module: ModuleType) -> dict[str, Engine]:
+    """
+    Get all the engines of a day, the reference one first.
+
+    :param ModuleType module: The day module
+    :return dict[str, Engine]: The engines by name
+    """
+    reference = Engine(partial(solve_reference, module))
+    return {REFERENCE: reference, **getattr(module, "ENGINES", {})}
+
+
+def input_size(file: InputSource) -> int:
+    """
+    Get the decompressed size of an input, `0` when it is a stream.
+
+    :param InputSource file: The input file path or stream
+    :return int: The size in bytes (estimated for bzip2 and xz files)
+    """
+    if isinstance(file, (str, PathLike)) and file != "-":
+        return decompressed_size(file)
+    return 0
+
+
+def select_engine(
+    module: ModuleType, file: InputSource, name: str | None = None
+) -> tuple[str, Engine]:
+    """
+    Select the engine of a day by name, or from the input size and the cores.
+
+    :param ModuleType module: The day module
+    :param InputSource file: The input file path or stream
+    :param str | None name: The engine name, defaults to None (automatic)
+    :raises ValueError: If the day has no engine with that name
+    :return tuple[str, Engine]: The engine name and the engine
+    """
+    engines = get_engines(module)
+    if name is not None:
+        if name not in engines:
+            raise ValueError(
+                f"Unknown engine {name!r}, available engines: {', '.join(engines)}"
+            )
+        return name, engines[name]
+
+    size = input_size(file)
+    cores = os.cpu_count() or 1
+    eligible = [
+        engine_name
+        for engine_name, engine in engines.items()
+        if engine.auto and engine.min_size <= size and engine.min_cores <= cores
+    ]
+    return eligible[-1], engines[eligible[-1]]
+
+
+def differential_check(
+    module: ModuleType, name: str, file: InputSource
+) -> tuple[tuple[int, int], tuple[int, int]]:
+    """
+    Solve an input with an engine and with the reference engine.
+
+    :param ModuleType module: The day module
+    :param str name: The engine name
+    :param InputSource file: The input file path (a stream can not be read twice)
+    :return tuple[tuple[int, int], tuple[int, int]]: The answers of the engine
+    and the answers of the reference engine
+    """
+    _, engine = select_engine(module, file, name)
+    return engine.solve(file), solve_reference(module, file)
+
+
+def solve_with_engine(
+    module: ModuleType,
+    file: InputSource,
+    name: str | None = None,
+    check_rate: float = 0.0,
+) -> tuple[int, int]:
+    """
+    Solve both parts of a day with the selected engine.
+
+    A fraction of the runs (`check_rate`) on input files are also solved with the
+    reference engine, a mismatch raises an error.
+
+    :param ModuleType module: The day module
+    :param InputSource file: The input file path or stream
+    :param str | None name: The engine name, defaults to None (automatic)
+    :param float check_rate: The fraction of the runs that are checked, defaults
+    to 0.0
+    :raises RuntimeError: If the checked engine disagrees with the reference
+    :return tuple[int, int]: The solutions of the first and second puzzles
+    """
+    name, engine = select_engine(module, file, name)
+    module.logger.debug("Solving with the %s engine", name)
+    answers = engine.solve(file)
+
+    if name != REFERENCE and check_rate and input_size(file):
+        # pylint: disable-next=import-outside-toplevel
+        import random
+
+        if random.random() < check_rate:
+            expected = solve_reference(module, file)
+            if answers != expected:
+                raise RuntimeError(
+                    f"The {name} engine answered {answers} on {file}, "
+                    f"the reference engine {expected}"
+                )
+
+    return answers
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    # pylint: disable=import-outside-toplevel
+    import argparse
+    import random
+    import sys
+
+    from aoc.days import load_day
+
+    parser = argparse.ArgumentParser(description="Check the engines of a day.")
+    parser.add_argument("day", type=int)
+    parser.add_argument("files", nargs="*", help="default: the day's inputs")
+    parser.add_argument("--engine", help="the engine to check (default: all)")
+    parser.add_argument("--sample", type=int, help="check N random files only")
+    args = parser.parse_args()
+
+    module = load_day(args.day)
+    files = args.files
+    if not files:
+        inputs_folder = os.path.join(os.path.dirname(module.__file__), "inputs")
+        files = sorted(
+            os.path.join(inputs_folder, file) for file in os.listdir(inputs_folder)
+        )
+    if args.sample is not None and args.sample < len(files):
+        files = random.sample(files, args.sample)
+    names = [args.engine] if args.engine else list(get_engines(module))[1:]
+
+    mismatches = 0
+    for name in names:
+        for file in files:
+            answers, expected = differential_check(module, name, file)
+            status = "OK" if answers == expected else f"MISMATCH, expected {expected}"
+            mismatches += answers != expected
+            print(f"{name} on {file}: {answers} {status}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
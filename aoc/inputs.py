@@ -0,0 +1,128 @@
+"""
+Opening of the puzzle inputs.
+
+The `read_input` functions of the days accept:
+- the path of an input file, `-` being the standard input;
+- an opened binary stream (e.g. `sys.stdin.buffer`);
+- an opened text stream (e.g. an inline payload wrapped in a `io.StringIO`).
+
+Files and binary streams compressed with gzip, bzip2 or xz are detected from
+their first bytes and decompressed on the fly. Everything is read and decoded
+incrementally in blocks of `BLOCK_SIZE` bytes, the decompressed input is never
+stored as a whole.
+"""
+
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from io import BufferedReader, IOBase, TextIOBase, TextIOWrapper
+from os import PathLike
+
+# An input file path or an opened binary or text stream
+InputSource = str | PathLike | IOBase
+
+# Size of the blocks read from the inputs
+BLOCK_SIZE = 1 << 20
+
+# Magic bytes of the supported compression formats
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+# Estimated decompressed / compressed size ratio of the inputs compressed in a
+# format that does not store the decompressed size (bzip2, xz)
+COMPRESSION_RATIO = 4
+
+
+def _decompress(stream: BufferedReader) -> IOBase | None:
+    """
+    Get a decompressing reader of a stream if it is compressed.
+
+    The compression modules are only imported when needed.
+
+    :param BufferedReader stream: The (peekable) binary stream
+    :return IOBase | None: The decompressing reader, `None` if the stream is
+    not compressed
+    """
+    # pylint: disable=import-outside-toplevel
+    magic = stream.peek(len(XZ_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        import gzip
+
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if magic.startswith(BZIP2_MAGIC):
+        import bz2
+
+        return bz2.BZ2File(stream)
+    if magic.startswith(XZ_MAGIC):
+        import lzma
+
+        return lzma.LZMAFile(stream)
+    return None
+
+
+def decompressed_size(file: str | PathLike) -> int:
+    """
+    Get the size of an input file once decompressed.
+
+    A gzip file stores its decompressed size modulo 2**32 in its last 4 bytes
+    (only the size of its last member when there are several), the size of
+    bzip2 and xz files is estimated with `COMPRESSION_RATIO`.
+
+    :param str | PathLike file: The input file path
+    :return int: The size in bytes, exact for uncompressed files
+    """
+    size = os.path.getsize(file)
+    with open(file, "rb") as in_file:
+        magic = in_file.read(len(XZ_MAGIC))
+        if magic.startswith(GZIP_MAGIC) and size >= 4:
+            in_file.seek(-4, os.SEEK_END)
+            decompressed = int.from_bytes(in_file.read(4), "little")
+            # The size wraps around past 4 GiB
+            while decompressed < size:
+                decompressed += 1 << 32
+            return decompressed
+        if magic.startswith((BZIP2_MAGIC, XZ_MAGIC)):
+            return size * COMPRESSION_RATIO
+    return size
+
+
+@contextmanager
+def open_input(file: InputSource) -> Iterator[TextIOBase]:
+    """
+    Open an input for reading, as a text stream.
+
+    A stream given by the caller is not closed when the context exits, its
+    owner remains responsible for it.
+
+    :param InputSource file: The input file path or stream
+    :yield TextIOBase: The text stream
+    """
+    if isinstance(file, TextIOBase):
+        yield file
+        return
+
+    # The layers added on top of the input are released in reverse order, the
+    # ones wrapping a stream of the caller are detached rather than closed
+    with ExitStack() as layers:
+        if isinstance(file, IOBase):
+            stream = file
+        elif file == "-":
+            stream = sys.stdin.buffer
+        else:
+            stream = layers.enter_context(open(file, "rb", buffering=BLOCK_SIZE))
+
+        if not hasattr(stream, "peek"):
+            stream = BufferedReader(stream, BLOCK_SIZE)
+            layers.callback(stream.detach)
+
+        decompressed = _decompress(stream)
+        if decompressed is not None:
+            layers.callback(decompressed.close)
+            stream = BufferedReader(decompressed, BLOCK_SIZE)
+            layers.callback(stream.detach)
+
+        text = TextIOWrapper(stream, encoding="utf-8")
+        layers.callback(text.detach)
+        yield text
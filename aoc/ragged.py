@@ -0,0 +1,216 @@
+"""
+Compact storage of rows of integers of different lengths.
+
+A `RaggedArray` keeps all the values in one flat `array("i")` and the row
+boundaries in an offsets array (the CSR layout): row `i` is
+`values[offsets[i]:offsets[i + 1]]`. Compared to a `list[list[int]]`, there is
+no list object per row and no int object per value.
+
+The rows are parsed by blocks of text rather than line by line: the blocks of
+large inputs are parsed with NumPy, all the values of a block at once and the
+row lengths from the positions of the newlines. NumPy is only imported once an
+input reaches `BULK_MIN_SIZE`, its import costs more than it saves below.
+"""
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from io import TextIOBase
+from itertools import pairwise
+
+from aoc.inputs import BLOCK_SIZE
+
+# Size of the blocks from which NumPy parses the values (the blocks are cut after
+# their last newline, so a full block is a bit shorter than `BLOCK_SIZE`)
+BULK_MIN_SIZE = BLOCK_SIZE // 2
+
+
+class RaggedArray:
+    """
+    Rows of integers stored as a flat values array plus row offsets.
+
+    The rows are returned as `memoryview` slices of the values: views without
+    copy that support `len`, indexing, slicing, iteration, `in` and `tolist()`
+    like lists do. The values can not grow (`append`) while a row view is alive.
+    """
+
+    __slots__ = ("values", "offsets")
+
+    def __init__(self) -> None:
+        """
+        Create an empty ragged array.
+        """
+        self.values = array("i")
+        self.offsets = array("q", [0])
+
+    @classmethod
+    def parse(
+        cls,
+        lines: Iterable[str] | TextIOBase,
+        sep: str | None = None,
+        skip_empty: bool = False,
+    ) -> "RaggedArray":
+        """
+        Parse one row per line, the values being separated by `sep`.
+
+        :param Iterable[str] | TextIOBase lines: The lines to parse, or a text
+        stream read by blocks from its current position
+        :param str | None sep: The values separator, whitespace being allowed
+        around it, defaults to None (whitespace)
+        :param bool skip_empty: `True` to skip the empty lines, `False` to parse
+        them as empty rows, defaults to `False`
+        :raises ValueError: If a value is not an integer
+        :return RaggedArray: The parsed rows
+        """
+        ragged = cls()
+        for block in _text_blocks(lines):
+            if len(block) >= BULK_MIN_SIZE or "numpy" in sys.modules:
+                ragged._parse_bulk(block, sep, skip_empty)
+            else:
+                ragged._parse_lines(block, sep, skip_empty)
+        return ragged
+
+    def _parse_lines(self, block: str, sep: str | None, skip_empty: bool) -> None:
+        """
+        Parse a block of lines, line by line.
+
+        :param str block: The lines, each one ending with a newline
+        :param str | None sep: The values separator
+        :param bool skip_empty: `True` to skip the empty lines
+        """
+        values, offsets = self.values, self.offsets
+        for line in block.split("\n")[:-1]:
+            if line.strip():
+                values.extend(map(int, line.split(sep)))
+            elif skip_empty:
+                continue
+            offsets.append(len(values))
+
+    def _parse_bulk(self, block: str, sep: str | None, skip_empty: bool) -> None:
+        """
+        Parse a block of lines with NumPy, all the values at once.
+
+        :param str block: The lines, each one ending with a newline
+        :param str | None sep: The values separator
+        :param bool skip_empty: `True` to skip the empty lines
+        :raises ValueError: If a value is not an integer
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        data = block.encode()
+        if sep is not None:
+            data = data.replace(sep.encode(), b" ")
+        chars = np.frombuffer(data, dtype=np.uint8)
+
+        # The values start after a separator, each newline ends a row
+        newlines = chars == ord("\n")
+        separators = newlines | (chars == ord(" ")) | (chars == ord("\t"))
+        separators |= chars == ord("\r")
+        value_starts = np.flatnonzero(
+            ~separators & np.concatenate(([True], separators[:-1]))
+        )
+        row_lengths = np.bincount(
+            np.cumsum(newlines)[value_starts], minlength=int(newlines.sum())
+        )
+        if skip_empty:
+            row_lengths = row_lengths[row_lengths > 0]
+
+        if len(value_starts):
+            values = np.fromstring(data, dtype=f"i{self.values.itemsize}", sep=" ")
+            if len(values) != len(value_starts):
+                raise ValueError("The rows contain values that are not integers")
+            self.values.frombytes(values.tobytes())
+        offsets = np.cumsum(row_lengths, dtype=np.int64) + self.offsets[-1]
+        self.offsets.frombytes(offsets.tobytes())
+
+    def append(self, row: Iterable[int]) -> None:
+        """
+        Add a row at the end.
+
+        :param Iterable[int] row: The row values
+        """
+        self.values.extend(row)
+        self.offsets.append(len(self.values))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int | slice) -> "memoryview | RaggedArray":
+        if isinstance(index, slice):
+            return self._take(*index.indices(len(self)))
+        if index < 0:
+            index += len(self)
+        return memoryview(self.values)[self.offsets[index] : self.offsets[index + 1]]
+
+    def _take(self, start: int, stop: int, step: int) -> "RaggedArray":
+        """
+        Copy a contiguous range of rows to a new ragged array.
+
+        :param int start: The first row
+        :param int stop: The row after the last one
+        :param int step: The step, only 1 is supported
+        :raises ValueError: If the step is not 1
+        :return RaggedArray: The rows
+        """
+        if step != 1:
+            raise ValueError("Only contiguous rows can be taken")
+        stop = max(start, stop)
+        base = self.offsets[start]
+        ragged = RaggedArray()
+        ragged.values = self.values[base : self.offsets[stop]]
+        ragged.offsets = array(
+            "q", (offset - base for offset in self.offsets[start : stop + 1])
+        )
+        return ragged
+
+    def __iter__(self) -> Iterator[memoryview]:
+        values = memoryview(self.values)
+        for start, end in pairwise(self.offsets):
+            yield values[start:end]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the values and offsets buffers.
+
+        :return int: The size in bytes
+        """
+        return (
+            len(self.values) * self.values.itemsize
+            + len(self.offsets) * self.offsets.itemsize
+        )
+
+
+def _text_blocks(lines: Iterable[str] | TextIOBase) -> Iterator[str]:
+    """
+    Group lines into blocks of about `BLOCK_SIZE` characters.
+
+    :param Iterable[str] | TextIOBase lines: The lines, with or without their
+    newline, or a text stream
+    :yield str: The blocks of whole lines, each line ending with a newline
+    """
+    if isinstance(lines, TextIOBase):
+        # Cut the blocks read from the stream after their last newline
+        rest = ""
+        while block := lines.read(BLOCK_SIZE):
+            block = rest + block
+            end = block.rfind("\n") + 1
+            rest = block[end:]
+            if end:
+                yield block[:end]
+        if rest:
+            yield rest + "\n"
+        return
+
+    block_lines: list[str] = []
+    block_size = 0
+    for line in lines:
+        line = line.rstrip("\n")
+        block_lines.append(line)
+        block_size += len(line) + 1
+        if block_size >= BLOCK_SIZE:
+            yield "\n".join(block_lines) + "\n"
+            block_lines.clear()
+            block_size = 0
+    if block_lines:
+        yield "\n".join(block_lines) + "\n"
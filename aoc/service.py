@@ -0,0 +1,404 @@
+"""
+Warm solver service.
+
+Keeps the day modules loaded and answers solve requests, either over a Unix
+socket (one JSON object per line) or over localhost HTTP (`POST /solve`).
+
+A request gives the day, the part, either the path of the input file or the
+input itself, and optionally the engine solving it:
+
+    {"day": 5, "part": 2, "path": "/path/to/input"}
+    {"day": 1, "part": 1, "input": "3   4\\n4   3\\n..."}
+    {"day": 2, "part": 2, "path": "/path/to/input", "engine": "memoized"}
+
+and is answered with `{"day": 5, "part": 2, "answer": 123}` or with
+`{"error": "..."}`. The paths are resolved in the input root (`--input-root`,
+the current directory by default), the files outside of it are refused. Only
+the invalid requests are answered with the reason of the error, a failure of the
+solver is answered with a generic error (the details are logged).
+
+The solving is done by a bounded pool of worker processes. Each worker keeps the
+day modules imported and an LRU cache of prepared inputs (the output of the
+day's `prepare` function, or of `read_input` when it has none, e.g. the day 5
+ordering rules or the day 1 right-list count index). A request naming one of
+the day's engines (see `aoc.engines`) is solved by that engine instead, and the
+worker caches both answers, e.g. the day 2 `memoized` engine also keeps the
+report verdicts in the worker between the requests. The requests on a given
+input are always routed to the same worker so both parts reuse its cache.
+
+Usage: `python -m aoc.service (--unix PATH | --port PORT) [--workers N]
+[--input-root DIR]`
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from typing import Any
+
+from aoc.days import DAYS, load_day
+from aoc.engines import select_engine
+from aoc.tracing import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Prepared inputs (or engine answers) of the current worker process, by (day,
+# input key, engine)
+_PREPARED: OrderedDict[tuple, Any] = OrderedDict()
+# Settings of the current worker process (see `_init_worker`)
+_WORKER = {"cache_size": 32}
+
+
+class RequestError(ValueError):
+    """
+    An invalid request, its message is sent back to the client.
+    """
+
+
+def _init_worker(cache_size: int) -> None:
+    """
+    Initialize a worker process: set its cache size and load all the days.
+
+    :param int cache_size: The number of prepared inputs kept by the worker
+    """
+    _WORKER["cache_size"] = cache_size
+    for day in DAYS:
+        load_day(day)
+
+
+def input_key(request: dict[str, Any], input_root: str) -> tuple:
+    """
+    Get the key identifying the input of a request.
+
+    A file is identified by its path, modification time and size, an inline
+    input by its digest.
+
+    :param dict[str, Any] request: The request
+    :param str input_root: The folder the input files must be in, the relative
+    paths are relative to it
+    :raises RequestError: If the request has neither `path` nor `input`, or if
+    the file is not a readable file of the input root
+    :return tuple: The input key
+    """
+    if "path" in request:
+        if not isinstance(request["path"], str):
+            raise RequestError("The 'path' must be a string")
+        # Resolve the links too, so that they can not lead out of the root
+        path = os.path.realpath(os.path.join(input_root, request["path"]))
+        if os.path.commonpath((path, input_root)) != input_root:
+            raise RequestError("The 'path' is outside of the input root")
+        try:
+            stat = os.stat(path)
+        except OSError as error:
+            raise RequestError(f"Can not read the input {request['path']!r}") from error
+        return ("path", path, stat.st_mtime_ns, stat.st_size)
+    if "input" in request:
+        if not isinstance(request["input"], str):
+            raise RequestError("The 'input' must be a string")
+        return ("input", hashlib.sha256(request["input"].encode()).hexdigest())
+    raise RequestError("The request needs a 'path' or an 'input'")
+
+
+def solve_request(
+    day: int, part: int, key: tuple, source: str, engine: str | None = None
+) -> int:
+    """
+    Solve a part of a day, reusing the prepared input when it is cached.
+
+    Runs in a worker process.
+
+    :param int day: The day number
+    :param int part: The part number (1 or 2)
+    :param tuple key: The input key (see `input_key`)
+    :param str source: The input file path or the inline input
+    :param str | None engine: The engine name, defaults to None (the day's
+    `solve` functions)
+    :raises RequestError: If the day has no engine with that name
+    :return int: The answer
+    """
+    module = load_day(day)
+    if engine is not None:
+        try:
+            _, solver = select_engine(module, source, engine)
+        except ValueError as error:
+            raise RequestError(str(error)) from error
+    # With an engine, both answers are cached rather than the prepared input
+    cache_key = (day, key, engine)
+    if cache_key in _PREPARED:
+        _PREPARED.move_to_end(cache_key)
+        cached = _PREPARED[cache_key]
+    else:
+        file = source if key[0] == "path" else StringIO(source)
+        if engine is not None:
+            cached = solver.solve(file)
+        else:
+            cached = getattr(module, "prepare", module.read_input)(file)
+        _PREPARED[cache_key] = cached
+        if len(_PREPARED) > _WORKER["cache_size"]:
+            _PREPARED.popitem(last=False)
+
+    if engine is not None:
+        return int(cached[part - 1])
+    return int(getattr(module, f"solve{part}")(cached))
+
+
+class SolverService:
+    """
+    Dispatches the solve requests to a bounded pool of warm worker processes.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_pending: int = 0,
+        cache_size: int = 32,
+        input_root: str = ".",
+    ) -> None:
+        """
+        Start the worker processes.
+
+        :param int workers: The number of worker processes, defaults to the
+        number of CPUs
+        :param int max_pending: The maximum number of requests being solved or
+        waiting for a worker, the others wait for a slot, defaults to 4 per worker
+        :param int cache_size: The number of prepared inputs kept by each worker,
+        defaults to 32
+        :param str input_root: The folder the input files must be in, defaults to
+        the current directory
+        """
+        workers = workers or os.cpu_count() or 1
+        self._cache_size = cache_size
+        self._input_root = os.path.realpath(input_root)
+        # One single-process pool per worker, so that an input is always
+        # solved by the worker that has it in cache
+        self._pools = [self._start_worker() for _ in range(workers)]
+        self._pools_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending or 4 * workers)
+
+    def _start_worker(self) -> ProcessPoolExecutor:
+        """
+        Start a worker process, with an empty cache.
+
+        :return ProcessPoolExecutor: The single-process pool of the worker
+        """
+        return ProcessPoolExecutor(
+            1, initializer=_init_worker, initargs=(self._cache_size,)
+        )
+
+    def _restart_worker(self, worker_nb: int, broken: ProcessPoolExecutor) -> None:
+        """
+        Replace a worker whose process died, its cache is lost.
+
+        :param int worker_nb: The worker number
+        :param ProcessPoolExecutor broken: The pool of the dead worker
+        """
+        with self._pools_lock:
+            # Another request may have restarted it already
+            if self._pools[worker_nb] is broken:
+                logger.warning("Worker %s died, restarting it", worker_nb)
+                self._pools[worker_nb] = self._start_worker()
+                broken.shutdown(wait=False)
+
+    def solve(self, request: dict[str, Any]) -> int:
+        """
+        Solve a request.
+
+        :param dict[str, Any] request: The request
+        :raises RequestError: If the request is invalid
+        :raises BrokenProcessPool: If the worker died again on the retry
+        :return int: The answer
+        """
+        if not isinstance(request, dict):
+            raise RequestError("The request must be a JSON object")
+        day, part = request.get("day"), request.get("part")
+        if day not in DAYS:
+            raise RequestError(f"No solution for day {day}")
+        if part not in (1, 2):
+            raise RequestError(f"Invalid part {part}")
+        engine = request.get("engine")
+        if engine is not None and not isinstance(engine, str):
+            raise RequestError("The 'engine' must be a string")
+
+        key = input_key(request, self._input_root)
+        source = request["path"] if key[0] == "path" else request["input"]
+        worker_nb = hash(key) % len(self._pools)
+        with self._slots:
+            pool = self._pools[worker_nb]
+            try:
+                return pool.submit(
+                    solve_request, day, part, key, source, engine
+                ).result()
+            except BrokenProcessPool:
+                # The worker process died (killed, out of memory...), retry once
+                # on a new one
+                self._restart_worker(worker_nb, pool)
+                pool = self._pools[worker_nb]
+                return pool.submit(
+                    solve_request, day, part, key, source, engine
+                ).result()
+
+    def handle(self, request: dict[str, Any]) -> tuple[HTTPStatus, dict[str, Any]]:
+        """
+        Answer a request, errors included.
+
+        :param dict[str, Any] request: The request
+        :return tuple[HTTPStatus, dict[str, Any]]: The status and the response
+        """
+        try:
+            answer = self.solve(request)
+        except RequestError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except BrokenProcessPool:
+            logger.error("Request %s failed: the worker died twice", request)
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "No worker available"}
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A failing request must not bring the service down, the details
+            # (e.g. the content of the input) are only logged
+            logger.exception("Request %s failed", request)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "The solving failed"}
+
+        response = {"day": request["day"], "part": request["part"], "answer": answer}
+        return HTTPStatus.OK, response
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        for pool in self._pools:
+            pool.shutdown()
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a Unix socket connection: one JSON request per line.
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                _, response = self.server.service.handle(json.loads(line))
+            except json.JSONDecodeError as error:
+                response = {"error": f"Invalid JSON: {error}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    """
+    Handles the `POST /solve` HTTP requests.
+    """
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        Answer a solve request.
+        """
+        if self.path != "/solve":
+            self.send_error(404)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            status, response = self.server.service.handle(json.loads(body))
+        except json.JSONDecodeError as error:
+            status = HTTPStatus.BAD_REQUEST
+            response = {"error": f"Invalid JSON: {error}"}
+
+        payload = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=W0622
+        logger.debug(format, *args)
+
+
+def make_server(
+    service: SolverService, unix: str | None = None, port: int | None = None
+) -> socketserver.BaseServer:
+    """
+    Create the server answering the requests with the service.
+
+    :param SolverService service: The solver service
+    :param str | None unix: The Unix socket path, defaults to None
+    :param int | None port: The localhost HTTP port, used when no Unix socket is
+    given, defaults to None
+    :return socketserver.BaseServer: The server, not started
+    """
+    server: socketserver.BaseServer
+    if unix:
+        if os.path.exists(unix):
+            # Remove the socket left by a previous run
+            os.unlink(unix)
+        server = socketserver.ThreadingUnixStreamServer(unix, _LineHandler)
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", port or 0), _HTTPHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def query(unix: str, request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Send a request to a service listening on a Unix socket.
+
+    :param str unix: The Unix socket path
+    :param dict[str, Any] request: The request
+    :return dict[str, Any]: The response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(unix)
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as responses:
+            return json.loads(responses.readline())
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--unix", help="listen on this Unix socket")
+    address.add_argument("--port", type=int, help="listen on this localhost port")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes")
+    parser.add_argument("--max-pending", type=int, default=0)
+    parser.add_argument("--cache-size", type=int, default=32)
+    parser.add_argument(
+        "--input-root",
+        default=".",
+        help="folder of the input files that can be requested (default: .)",
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    service = SolverService(
+        args.workers, args.max_pending, args.cache_size, args.input_root
+    )
+    server = make_server(service, args.unix, args.port)
+    logger.info("Listening on %s", args.unix or f"http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix:
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main()
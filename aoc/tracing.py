@@ -0,0 +1,152 @@
+"""
+Aggregated tracing for the puzzle solvers.
+
+The solvers used to log one record per iteration of their innermost loops,
+which costs a function call and a level check even when the record is
+filtered out. A `Tracer` instead keeps counters that the solvers update once
+per loop, emits a summary of those counters each time one of them goes past a
+multiple of `summary_every`, and optionally logs one detailed event out of every
+`sample_every`. The entry points log a last summary once solved.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+LOG_FORMAT = "%(levelname)s - %(name)s : %(message)s"
+
+# Tracers created so far, by name
+_TRACERS: dict[str, Tracer] = {}
+# Settings applied to every tracer (see `configure_tracing`)
+_SETTINGS = {"sample_every": 0, "summary_every": 0}
+
+
+class Tracer:
+    """
+    Counters and sampled detailed events for one solver module.
+
+    Hot loops should fetch `sample` once before looping (it is `None` when
+    sampling is disabled), accumulate their counts in local variables and hand
+    them to `count` after the loop.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Create a tracer.
+
+        :param str name: The tracer name, also used as the logger name
+        """
+        self.name = name
+        self.logger = logging.getLogger(name)
+        self.counters: dict[str, int] = {}
+        # Number of detailed events seen for each event name
+        self._seen: dict[str, int] = {}
+
+    @property
+    def sample(self) -> Callable[..., None] | None:
+        """
+        The sampling function, or `None` when detailed events are not logged.
+
+        :return Callable[..., None] | None: `Tracer.log_sample` when sampling is
+        enabled
+        """
+        if _SETTINGS["sample_every"] and self.logger.isEnabledFor(logging.DEBUG):
+            return self.log_sample
+        return None
+
+    def log_sample(self, event: str, msg: str, *args) -> None:
+        """
+        Log a detailed event if it is the first of its batch of `sample_every`.
+
+        :param str event: The event name
+        :param str msg: The log message format
+        """
+        seen = self._seen.get(event, 0)
+        self._seen[event] = seen + 1
+        if seen % _SETTINGS["sample_every"] == 0:
+            self.logger.debug("[%s #%s] " + msg, event, seen + 1, *args)
+
+    def count(self, event: str, amount: int = 1) -> None:
+        """
+        Add `amount` to the counter of an event.
+
+        A summary is logged each time the counter of the event goes past a
+        multiple of `summary_every` (each event is counted on its own).
+
+        :param str event: The event name
+        :param int amount: The number of occurrences to add, defaults to 1
+        """
+        previous = self.counters.get(event, 0)
+        self.counters[event] = previous + amount
+        summary_every = _SETTINGS["summary_every"]
+        if summary_every and (previous + amount) // summary_every > (
+            previous // summary_every
+        ):
+            self.summarize()
+
+    def summarize(self, level: int = logging.DEBUG) -> None:
+        """
+        Log the current value of every counter.
+
+        :param int level: The log level of the summary, defaults to DEBUG
+        """
+        if self.counters and self.logger.isEnabledFor(level):
+            self.logger.log(
+                level,
+                "Summary: %s",
+                ", ".join(f"{event}={nb}" for event, nb in self.counters.items()),
+            )
+
+    def reset(self) -> None:
+        """
+        Reset the counters and the sampling state.
+        """
+        self.counters.clear()
+        self._seen.clear()
+
+
+def get_tracer(name: str) -> Tracer:
+    """
+    Get the tracer with the given name, creating it if needed.
+
+    :param str name: The tracer name (usually the module `__name__`)
+    :return Tracer: The tracer
+    """
+    if name not in _TRACERS:
+        _TRACERS[name] = Tracer(name)
+    return _TRACERS[name]
+
+
+def configure_tracing(sample_every: int = 0, summary_every: int = 0) -> None:
+    """
+    Configure every tracer.
+
+    :param int sample_every: Log one detailed event out of `sample_every`,
+    `0` disables sampling, defaults to 0
+    :param int summary_every: Log a summary each time the counter of an event
+    goes past a multiple of `summary_every`, `0` disables the periodic
+    summaries, defaults to 0
+    """
+    _SETTINGS["sample_every"] = sample_every
+    _SETTINGS["summary_every"] = summary_every
+
+
+def configure_logging(
+    level: int | str = logging.INFO, sample_every: int = 0, summary_every: int = 0
+) -> None:
+    """
+    Configure the logging output and the tracers.
+
+    Meant to be called by the entry points, importing a solver module does not
+    configure anything.
+
+    :param int | str level: The log level (e.g. `logging.DEBUG` or `"DEBUG"`),
+    defaults to INFO
+    :param int sample_every: See `configure_tracing`, defaults to 0
+    :param int summary_every: See `configure_tracing`, defaults to 0
+    """
+    logging.basicConfig(
+        level=level, handlers=[logging.StreamHandler()], format=LOG_FORMAT
+    )
+    configure_tracing(sample_every, summary_every)
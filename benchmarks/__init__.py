@@ -0,0 +1 @@
+"""Benchmarks of the puzzle solutions."""
@@ -0,0 +1,73 @@
+"""
+Speedup of the fused `solve_both` over solving both puzzles in sequence.
+
+For each day, a random input is generated and solved with `puzzle1` then
+`puzzle2` (two parses, two traversals) and with `solve_both` (one of each).
+
+Usage: `python -m benchmarks.fused [--runs N] [--scale X] [DAY ...]`
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from os.path import join as pathjoin
+from typing import Any
+
+from aoc.days import DAYS, load_day
+from benchmarks.inputs import generate_input
+
+# Size of the generated input of each day (see `generate_input`)
+INPUT_SIZES = {1: 200_000, 2: 200_000, 3: 200_000, 4: 250_000, 5: 20_000}
+
+
+def best_time(func: Callable[[], Any], runs: int) -> tuple[Any, float]:
+    """
+    Call a function several times and keep the best time.
+
+    :param Callable[[], Any] func: The function
+    :param int runs: The number of calls
+    :return tuple[Any, float]: The function result and its best time in seconds
+    """
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("days", nargs="*", type=int, default=DAYS)
+    parser.add_argument("--runs", type=int, default=3, help="runs per solver")
+    parser.add_argument("--scale", type=float, default=1, help="input size factor")
+    args = parser.parse_args()
+    random.seed(2024)
+
+    print(f"{'day':>3} | {'sequence':>9} | {'fused':>9} | {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for day in args.days:
+            module = load_day(day)
+            file = pathjoin(tmp_dir, f"input{day}")
+            with open(file, "w", encoding="utf-8") as out_file:
+                out_file.write(generate_input(day, int(INPUT_SIZES[day] * args.scale)))
+
+            sequence, sequence_time = best_time(
+                lambda: (module.puzzle1(file), module.puzzle2(file)), args.runs
+            )
+            fused, fused_time = best_time(lambda: module.solve_both(file), args.runs)
+            if fused != sequence:
+                raise RuntimeError(f"Day {day}: {fused} != {sequence}")
+            print(
+                f"{day:>3} | {sequence_time:>7.3f} s | {fused_time:>7.3f} s "
+                f"| {sequence_time / fused_time:>6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Generation of large random puzzle inputs for the benchmarks.
+"""
+
+import random
+
+
+def generate_reports(nb_rows: int) -> list[str]:
+    """
+    Generate day 2 report lines (5 to 8 levels each).
+
+    :param int nb_rows: The number of reports
+    :return list[str]: The lines
+    """
+    lines = []
+    for _ in range(nb_rows):
+        level = random.randint(1, 50)
+        levels = [level]
+        for _ in range(random.randint(4, 7)):
+            level += random.choice((-3, -2, -1, 1, 2, 3, 4))
+            levels.append(level)
+        lines.append(" ".join(map(str, levels)) + "\n")
+    return lines
+
+
+def generate_updates(nb_rows: int) -> tuple[dict[int, list[int]], list[str]]:
+    """
+    Generate day 5 ordering rules and update lines (5 to 23 pages each).
+
+    :param int nb_rows: The number of updates
+    :return tuple[dict[int, list[int]], list[str]]: The ordering rules and the
+    update lines
+    """
+    pages = list(range(10, 100))
+    ordering_rules: dict[int, list[int]] = {}
+    for first_page in pages:
+        for second_page in pages:
+            if first_page < second_page and random.random() < 0.3:
+                ordering_rules.setdefault(second_page, []).append(first_page)
+    lines = [
+        ",".join(map(str, random.sample(pages, random.randrange(5, 24, 2)))) + "\n"
+        for _ in range(nb_rows)
+    ]
+    return ordering_rules, lines
+
+
+def generate_input(day: int, size: int) -> str:
+    """
+    Generate a complete input of a day.
+
+    :param int day: The day number
+    :param int size: The number of lines (days 1, 2 and 5), of instructions
+    (day 3) or of grid cells (day 4)
+    :return str: The input content
+    """
+    if day == 1:
+        return "".join(
+            f"{random.randint(10000, 99999)}   {random.randint(10000, 99999)}\n"
+            for _ in range(size)
+        )
+    if day == 2:
+        return "".join(generate_reports(size))
+    if day == 3:
+        junk = "xmul[3,7]!@^do_not_+mul(32,64]then(what()"
+        chunks = []
+        for _ in range(size):
+            roll = random.random()
+            if roll < 0.05:
+                chunks.append("do()")
+            elif roll < 0.1:
+                chunks.append("don't()")
+            else:
+                chunks.append(f"mul({random.randint(1, 999)},{random.randint(1, 999)})")
+            chunks.append(junk[: random.randint(0, len(junk))])
+        # Split the memory in lines of about 3000 characters
+        memory = "".join(chunks)
+        return "\n".join(memory[i : i + 3000] for i in range(0, len(memory), 3000))
+    if day == 4:
+        side = int(size**0.5)
+        return "".join(
+            "".join(random.choices("XMAS", k=side)) + "\n" for _ in range(side)
+        )
+    if day == 5:
+        ordering_rules, update_lines = generate_updates(size)
+        rule_lines = [
+            f"{first_page}|{second_page}\n"
+            for second_page, first_pages in ordering_rules.items()
+            for first_page in first_pages
+        ]
+        return "".join(rule_lines) + "\n" + "".join(update_lines)
+    raise ValueError(f"No input generator for day {day}")
@@ -0,0 +1,105 @@
+"""
+Memory and speed of the day 2 reports and day 5 updates representations.
+
+Compares the former `list[list[int]]` representation with `RaggedArray` on
+generated inputs: memory used by the parsed rows, parsing time and solving time.
+
+Usage: `python -m benchmarks.ragged [--rows N]`
+"""
+
+import argparse
+import io
+import random
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from aoc.days import load_day
+from aoc.ragged import RaggedArray
+from benchmarks.inputs import generate_reports, generate_updates
+
+
+def parse_lists(lines: Iterable[str], sep: str | None = None) -> list[list[int]]:
+    """
+    Parse the lines the way the days did before `RaggedArray`.
+
+    :param Iterable[str] lines: The lines
+    :param str | None sep: The values separator, defaults to None
+    :return list[list[int]]: The rows
+    """
+    return [[int(value.strip()) for value in line.split(sep)] for line in lines]
+
+
+def measure_memory(build: Callable[[], Any]) -> int:
+    """
+    Get the memory held by a structure once built.
+
+    :param Callable[[], Any] build: Builds the structure
+    :return int: The memory in bytes
+    """
+    tracemalloc.start()
+    built = build()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return memory
+
+
+def timed(func: Callable[[], Any]) -> tuple[Any, float]:
+    """
+    Time a function call.
+
+    :param Callable[[], Any] func: The function
+    :return tuple[Any, float]: The function result and the time in seconds
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+    random.seed(2024)
+
+    day2, day5 = load_day(2), load_day(5)
+    report_lines = generate_reports(args.rows)
+    ordering_rules, update_lines = generate_updates(args.rows)
+    benchmarks = {
+        "day 2 reports": (
+            report_lines,
+            None,
+            lambda rows: (day2.solve1(rows), day2.solve2(rows)),
+        ),
+        "day 5 updates": (
+            update_lines,
+            ",",
+            lambda rows: day5.solve1((ordering_rules, rows)),
+        ),
+    }
+
+    # Import the bulk parsing modules before measuring the parsed rows memory
+    RaggedArray.parse(io.StringIO("".join(report_lines)))
+
+    print(f"{'':>13} | {'':>6} | {'memory':>9} | {'parse':>7} | {'solve':>7}")
+    for name, (lines, sep, solve) in benchmarks.items():
+        # Both representations are parsed from a text stream, like the inputs
+        text = "".join(lines)
+        for kind, parse in (("lists", parse_lists), ("ragged", RaggedArray.parse)):
+            memory = measure_memory(lambda: parse(io.StringIO(text), sep))
+            rows, parse_time = timed(lambda: parse(io.StringIO(text), sep))
+            _, solve_time = timed(lambda: solve(rows))
+            print(
+                f"{name:>13} | {kind:>6} | {memory / 2**20:>6.1f} MB "
+                f"| {parse_time:>5.2f} s | {solve_time:>5.2f} s"
+            )
+            del rows
+
+
+if __name__ == "__main__":
+    main()
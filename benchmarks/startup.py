@@ -0,0 +1,106 @@
+"""
+Startup benchmark of the day modules.
+
+Each day is solved in a fresh `python -X importtime` interpreter, which gives
+the import cost of the day module and the time from the process start to its
+first printed result.
+
+Usage: `python -m benchmarks.startup [--runs N] [--input NAME] [DAY ...]`
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from os.path import dirname
+
+from aoc.days import DAYS, input_path, load_day
+
+# The repository root, where the day packages can be imported from
+ROOT = dirname(dirname(__file__))
+
+# Code run by the benchmarked interpreter. `__import__` is used rather than
+# `importlib.import_module` so that the import is reported by `-X importtime`.
+SOLVE_CODE = """
+import sys
+module = __import__(f"{sys.argv[1]}.main", fromlist=["main"])
+print(module.puzzle1(sys.argv[2]), flush=True)
+"""
+
+
+def parse_importtime(stderr: str, module_name: str) -> tuple[int, int]:
+    """
+    Parse the `-X importtime` report of an interpreter.
+
+    :param str stderr: The standard error of the interpreter
+    :param str module_name: The module to get the cumulative import time of
+    :return tuple[int, int]: The cumulative import time of `module_name` and the
+    total import time of the interpreter, in microseconds
+    """
+    module_us, total_us = 0, 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Only the top-level imports are added up, nested ones are in their
+        # parent's cumulative time
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+        if name.strip() == module_name:
+            module_us = int(cumulative)
+
+    return module_us, total_us
+
+
+def time_day(day: int, file: str) -> tuple[float, float, float]:
+    """
+    Solve the first part of a day in a fresh interpreter.
+
+    :param int day: The day number
+    :param str file: The input file
+    :return tuple[float, float, float]: The import time of the day module, the
+    total import time and the time to the first result, in milliseconds
+    """
+    start = time.perf_counter()
+    with subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", SOLVE_CODE, str(day), file],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    ) as process:
+        process.stdout.readline()
+        first_result = time.perf_counter() - start
+        _, stderr = process.communicate()
+
+    if process.returncode:
+        raise RuntimeError(f"Day {day} failed:\n{stderr}")
+
+    module_us, total_us = parse_importtime(stderr, f"{day}.main")
+    return module_us / 1000, total_us / 1000, first_result * 1000
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("days", nargs="*", type=int, default=DAYS)
+    parser.add_argument("--runs", type=int, default=5, help="runs per day")
+    parser.add_argument("--input", default="small_input", help="input file name")
+    args = parser.parse_args()
+
+    print(f"{'day':>3} | {'day import':>10} | {'all imports':>11} | {'1st result':>10}")
+    for day in args.days:
+        file = input_path(load_day(day).__file__, args.input)
+        runs = [time_day(day, file) for _ in range(args.runs)]
+        module_ms, total_ms, result_ms = (statistics.median(col) for col in zip(*runs))
+        print(
+            f"{day:>3} | {module_ms:>7.2f} ms | {total_ms:>8.2f} ms "
+            f"| {result_ms:>7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()